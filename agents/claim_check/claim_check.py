@@ -1,10 +1,8 @@
-import json
-from llm.groq_runtime import GroqRunTime
-from llm.gpt_runtime import GPTRunTime
+from clients.llm_clients import get_gpt_runtime, get_groq_runtime
+from llm.prompt_builder import build_prompt, Text, Items
 
 def claim_check(claim, evidence_link):
-    groq_runtime = GroqRunTime()
-    gpt_runtime = GPTRunTime()
+    gpt_runtime = get_gpt_runtime()
 
     system_prompt = """
 Kamu adalah asisten AI yang memverifikasi apakah daftar link berita relevan terhadap sebuah klaim.
@@ -30,18 +28,25 @@ Ikuti format output secara ketat.
 
 """
 
-    user_prompt = f"""
+    user_prompt = build_prompt(
+        "claim_check",
+        lambda claim, links: f"""
 Berikut klaim yang ingin diperiksa:
 {claim}
 
 Berikut daftar link berita (10 link):
-{json.dumps(evidence_link, ensure_ascii=False, indent=2)}
+{links}
 
 Tentukan apakah minimal satu link relevan secara makna dengan klaim, lalu berikan output sesuai aturan.
 
-"""
+""",
+        system_prompt=system_prompt,
+        # claim dari user bisa panjang: ikut dibagi budget, bukan bagian tetap template
+        claim=Text(claim, weight=2.0),
+        links=Items(evidence_link),
+    )
 
-    # response = groq_runtime.generate_response(system_prompt, user_prompt)
+    # response = get_groq_runtime().generate_response(system_prompt, user_prompt)
     response = gpt_runtime.generate_response(system_prompt, user_prompt)
 
     # pastikan output bersih (opsional sanity-check)
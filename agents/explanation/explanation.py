@@ -1,33 +1,46 @@
-import json
-from llm.groq_runtime import GroqRunTime
-from llm.gpt_runtime import GPTRunTime
+from clients.llm_clients import get_gpt_runtime, get_groq_runtime
+from llm.prompt_builder import build_prompt, compact_json, Text, Items, Evidence, PROMPT_TITLE_MAX_TOKENS
 
-def explanation(classification, news_scrape, title, evidence_link, content):
-    groq_runtime = GroqRunTime()
-    gpt_runtime = GPTRunTime()
+def explanation(classification, news_scrape, title, evidence_link, content, on_delta=None):
+    gpt_runtime = get_gpt_runtime()
 
     system_prompt = """Kamu adalah asisten AI yang menilai apakah suatu berita tergolong hoaks atau valid.
 Gunakan hasil klasifikasi IndoBERT dan hasil scraping berita dari internet sebagai referensi.
 """
 
-    user_prompt = f"""
+    user_prompt = build_prompt(
+        "explanation",
+        lambda title, links, evidence: f"""
 Berikut adalah berita yang ingin diklasifikasikan:
 
 Judul: {title}
 
 Hasil klasifikasi model kami:
-{json.dumps(classification, ensure_ascii=False, indent=2)}
+{compact_json(classification)}
 (kadang hasil klasifikasi bisa salah, jadi tentukan berdasarkan bukti yang ada)
 
 Link bukti yang ditemukan:
-{json.dumps(evidence_link, ensure_ascii=False, indent=2)}
+{links}
 
 Hasil scraping berita referensi:
-{json.dumps(news_scrape, ensure_ascii=False, indent=2)}
+{evidence}
 
 Tentukan apakah berita ini hoaks atau valid berdasarkan konteks dan kesesuaian dengan berita referensi.
-"""
-
-    # response = groq_runtime.generate_response(system_prompt, user_prompt)
+""",
+        system_prompt=system_prompt,
+        title=Text(title, weight=4.0, max_tokens=PROMPT_TITLE_MAX_TOKENS),
+        links=Items(evidence_link, weight=0.5),
+        evidence=Evidence(news_scrape, weight=2.0),
+    )
+
+    # on_delta: callback potongan teks selama LLM menulis (streaming SSE)
+    if on_delta is not None:
+        parts = []
+        for delta in gpt_runtime.stream_response(system_prompt, user_prompt):
+            parts.append(delta)
+            on_delta(delta)
+        return "".join(parts).strip()
+
+    # response = get_groq_runtime().generate_response(system_prompt, user_prompt)
     response = gpt_runtime.generate_response(system_prompt, user_prompt)
     return response
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import threading
+import time
+
+# statistik scrape per domain & tier ("direct" / "rendered" / "all"), disimpan di SQLite.
+# quality: skor 0-1 konten hasil scrape yang lolos validasi (lihat article_quality)
+
+
+class DomainStats:
+    def __init__(self, path=None):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS domain_stats ("
+                "domain TEXT, tier TEXT, attempts INTEGER, successes INTEGER, "
+                "total_latency REAL, last_attempt REAL, PRIMARY KEY (domain, tier))"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(domain_stats)")]
+            if "total_quality" not in columns:
+                self._db.execute("ALTER TABLE domain_stats ADD COLUMN total_quality REAL DEFAULT 0")
+            self._db.commit()
+
+            rows = self._db.execute(
+                "SELECT domain, tier, attempts, successes, total_latency, last_attempt, total_quality FROM domain_stats"
+            )
+            for domain, tier, attempts, successes, total_latency, last_attempt, total_quality in rows:
+                self._stats[(domain, tier)] = {
+                    "attempts": attempts,
+                    "successes": successes,
+                    "total_latency": total_latency,
+                    "last_attempt": last_attempt,
+                    "total_quality": total_quality or 0.0,
+                }
+
+    def get(self, domain, tier):
+        with self._lock:
+            stat = self._stats.get((domain, tier))
+            return dict(stat) if stat else None
+
+    def record(self, domain, tier, success, latency, quality=0.0):
+        with self._lock:
+            stat = self._stats.setdefault(
+                (domain, tier),
+                {"attempts": 0, "successes": 0, "total_latency": 0.0, "last_attempt": 0.0, "total_quality": 0.0}
+            )
+            stat["attempts"] += 1
+            stat["successes"] += int(bool(success))
+            stat["total_latency"] += latency
+            stat["last_attempt"] = time.time()
+            if success:
+                stat["total_quality"] += quality
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO domain_stats "
+                    "(domain, tier, attempts, successes, total_latency, last_attempt, total_quality) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (domain, tier, stat["attempts"], stat["successes"], stat["total_latency"],
+                     stat["last_attempt"], stat["total_quality"])
+                )
+                self._db.commit()
+
+    def success_rate(self, domain, tier):
+        stat = self.get(domain, tier)
+        if not stat or not stat["attempts"]:
+            return None
+        return stat["successes"] / stat["attempts"]
+
+    def mean_latency(self, domain, tier):
+        stat = self.get(domain, tier)
+        if not stat or not stat["attempts"]:
+            return None
+        return stat["total_latency"] / stat["attempts"]
+
+    def mean_quality(self, domain, tier):
+        stat = self.get(domain, tier)
+        if not stat or not stat["successes"]:
+            return None
+        return stat["total_quality"] / stat["successes"]
+
+
+def article_quality(article, full_chars=3000):
+    # 0 untuk gagal; selebihnya naik dengan panjang konten, bonus kecil kalau ada tanggal & gambar
+    if not article:
+        return 0.0
+    score = 0.8 * min(1.0, len(article.get("content") or "") / full_chars)
+    score += 0.1 if article.get("tanggal") not in (None, "Unknown") else 0.0
+    score += 0.1 if article.get("featured_image") else 0.0
+    return round(score, 4)
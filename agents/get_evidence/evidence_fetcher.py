@@ -0,0 +1,78 @@
+import os
+import threading
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from agents.get_evidence.scrape_html import scrape_html, ScrapeCancelled
+from agents.get_evidence.link_ranker import rank_links, LINK_RANKING_ENABLED
+from agents.get_evidence.evidence_index import index_evidence
+from agents.pipeline.deadline import DeadlineExceeded, time_left
+
+# jumlah link yang di-scrape bersamaan per request
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+
+
+def fetch_evidence(links, scrape_limit=1, max_concurrency=None, scrape=scrape_html):
+    # scrape beberapa link sekaligus, selesai begitu dapat `scrape_limit` hasil valid
+    max_concurrency = max(1, max_concurrency or SCRAPE_CONCURRENCY)
+    if scrape_limit <= 0 or not links:
+        return []
+
+    # domain yang biasanya berhasil dicoba duluan, duplikat & domain yang selalu gagal dibuang
+    if LINK_RANKING_ENABLED:
+        links = rank_links(links)
+
+    remaining = iter(links)
+    in_flight = {}
+    scraped = []
+    # di-set saat fetch selesai: scrape yang masih jalan tidak lanjut ke ScrapingBee
+    cancel = threading.Event()
+
+    # executor per request: scrape yang ditinggal tidak memakan slot request lain
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="scrape")
+
+    def submit_next():
+        url = next(remaining, None)
+        if url is not None:
+            # copy_context: deadline request ikut ke thread scrape
+            in_flight[executor.submit(copy_context().run, scrape, url, cancel)] = url
+
+    try:
+        for _ in range(max_concurrency):
+            submit_next()
+
+        while in_flight and len(scraped) < scrape_limit:
+            try:
+                timeout = time_left()
+            except DeadlineExceeded:
+                print(f"⏰ Batas waktu habis, pakai {len(scraped)} evidence yang sudah ada")
+                break
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            # urutkan sesuai urutan link supaya hasil yang selesai bersamaan tetap deterministik
+            for future in sorted(done, key=lambda f: links.index(in_flight[f])):
+                url = in_flight.pop(future)
+                try:
+                    content = future.result()
+                except ScrapeCancelled:
+                    content = None
+                except Exception as e:
+                    print(f"⚠️ Gagal scrape {url}: {e}")
+                    content = None
+
+                if content is None:
+                    print(f"❌ Gagal scrape → {url}")
+                elif len(scraped) < scrape_limit:
+                    print(f"✅ Berhasil scrape → {url}")
+                    scraped.append(content)
+
+                if len(scraped) < scrape_limit:
+                    submit_next()
+    finally:
+        # batalkan yang belum jalan; yang sedang jalan dibiarkan selesai di background,
+        # tapi berhenti sebelum tier ScrapingBee
+        cancel.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # evidence baru masuk index lokal, request berikutnya dengan topik sama tidak perlu scrape lagi
+    index_evidence(scraped)
+    return scraped
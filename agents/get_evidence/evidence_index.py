@@ -0,0 +1,272 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from agents.get_evidence.passage_ranker import tokenize, BM25_K1, BM25_B
+from agents.get_evidence.url_utils import canonicalize_url, url_domain
+
+# inverted index lokal (BM25) atas evidence yang di-scrape server sendiri dari hasil Google CSE.
+# isi request (POST /news) dan verdict service sendiri sengaja tidak di-index: bisa dipalsukan
+# client / salah klasifikasi lalu "membenarkan" dirinya sendiri.
+# pipeline cek index ini dulu; Google CSE + ScrapingBee hanya dipanggil kalau hasil lokal kurang
+EVIDENCE_INDEX_ENABLED = os.getenv("EVIDENCE_INDEX_ENABLED", "true").lower() == "true"
+EVIDENCE_INDEX_PATH = os.getenv("EVIDENCE_INDEX_PATH", ".cache/evidence_index.sqlite")
+# hasil lokal dianggap cukup kalau beberapa dokumen (domain berbeda) memuat sebagian besar kata kunci query
+LOCAL_MIN_COVERAGE = float(os.getenv("LOCAL_MIN_COVERAGE", "0.75"))
+LOCAL_MIN_SCORE = float(os.getenv("LOCAL_MIN_SCORE", "3.0"))
+LOCAL_MIN_DOCS = max(2, int(os.getenv("LOCAL_MIN_DOCS", "2")))
+# judul lebih menentukan topik daripada isi
+TITLE_WEIGHT = 3
+ARTICLE_FIELDS = ("judul", "tanggal", "sumber", "link", "content", "featured_image")
+# versi naik kalau format / tokenizer berubah (3: stemmer ringan menggantikan Sastrawi) -> index lama dibangun ulang
+INDEX_VERSION = "3"
+
+
+class EvidenceIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._db = None
+        self._loaded = False
+
+        self._postings = {}
+        self._arrays = {}
+        self._lengths = {}
+        self._keys = set()
+        self._length_array = None
+        # doc_id terbesar yang sudah dimuat dari disk
+        self._synced_id = 0
+
+    def _open(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                "doc_id INTEGER PRIMARY KEY, key TEXT UNIQUE, kind TEXT, article TEXT, length INTEGER, added_at REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                "term TEXT, doc_id INTEGER, tf INTEGER, PRIMARY KEY (term, doc_id)) WITHOUT ROWID"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            # index versi lama juga berisi evidence_scraped / berita dari POST /news -> buang semua
+            version = self._db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            if not version or version[0] != INDEX_VERSION:
+                self._db.execute("DELETE FROM postings")
+                self._db.execute("DELETE FROM docs")
+                self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('version', ?)", (INDEX_VERSION,))
+            self._db.commit()
+
+            start = time.perf_counter()
+            self._loaded = True
+            self._refresh()
+            if self._lengths:
+                print(f"📚 evidence index: {len(self._lengths)} dokumen, {len(self._postings)} term "
+                      f"({time.perf_counter() - start:.2f} s)")
+
+    def _refresh(self):
+        # worker uvicorn lain (WEB_CONCURRENCY) menulis ke file SQLite yang sama:
+        # dokumen yang belum ada di memori worker ini dimuat dari disk
+        with self._lock:
+            latest = self._db.execute("SELECT MAX(doc_id) FROM docs").fetchone()[0] or 0
+            if latest <= self._synced_id:
+                return
+            new_ids = set()
+            for doc_id, key, length in self._db.execute(
+                "SELECT doc_id, key, length FROM docs WHERE doc_id > ? AND doc_id <= ?", (self._synced_id, latest)
+            ):
+                if doc_id not in self._lengths:
+                    self._lengths[doc_id] = length
+                    self._keys.add(key)
+                    new_ids.add(doc_id)
+            if new_ids:
+                for term, doc_id, tf in self._db.execute(
+                    "SELECT term, doc_id, tf FROM postings WHERE doc_id > ? AND doc_id <= ? ORDER BY doc_id",
+                    (self._synced_id, latest)
+                ):
+                    if doc_id in new_ids:
+                        self._append_posting(term, doc_id, tf)
+                self._length_array = None
+            self._synced_id = latest
+
+    def _append_posting(self, term, doc_id, tf):
+        doc_ids, tfs = self._postings.setdefault(term, ([], []))
+        doc_ids.append(doc_id)
+        tfs.append(tf)
+        self._arrays.pop(term, None)
+
+    def __len__(self):
+        self._open()
+        self._refresh()
+        return len(self._lengths)
+
+    def add(self, article, kind="evidence"):
+        # return True kalau dokumen baru masuk index
+        if not isinstance(article, dict):
+            return False
+        link, content, judul = article.get("link"), article.get("content"), article.get("judul")
+        if not isinstance(link, str) or not isinstance(content, str) or not link or not content:
+            return False
+        self._open()
+
+        key = canonicalize_url(link)
+        self._refresh()
+        if key in self._keys:
+            return False
+
+        terms = tokenize(judul if isinstance(judul, str) else "") * TITLE_WEIGHT + tokenize(content)
+        if not terms:
+            return False
+        counts = Counter(terms)
+        stored = {field: article.get(field) for field in ARTICLE_FIELDS}
+
+        with self._lock:
+            if key in self._keys:
+                return False
+            # OR IGNORE: worker lain bisa saja baru memasukkan URL yang sama
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO docs (key, kind, article, length, added_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(stored, ensure_ascii=False), len(terms), time.time())
+            )
+            if cursor.rowcount == 0:
+                self._db.commit()
+                self._refresh()
+                return False
+            doc_id = cursor.lastrowid
+            self._db.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                [(term, doc_id, tf) for term, tf in counts.items()]
+            )
+            self._db.commit()
+
+            self._keys.add(key)
+            self._lengths[doc_id] = len(terms)
+            self._length_array = None
+            for term, tf in counts.items():
+                self._append_posting(term, doc_id, tf)
+        return True
+
+    def _term_arrays(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            doc_ids, tfs = self._postings[term]
+            arrays = (np.array(doc_ids, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            self._arrays[term] = arrays
+        return arrays
+
+    def _doc_lengths(self):
+        if self._length_array is None:
+            size = max(self._lengths) + 1 if self._lengths else 0
+            lengths = np.zeros(size, dtype=np.float32)
+            for doc_id, length in self._lengths.items():
+                lengths[doc_id] = length
+            self._length_array = lengths
+        return self._length_array
+
+    def search(self, query, k=5):
+        # -> [{"article", "score", "coverage", "kind"}], skor BM25 + porsi kata kunci query yang muncul
+        self._open()
+        self._refresh()
+        query_terms = tokenize(query)
+        terms = [term for term in dict.fromkeys(query_terms) if term in self._postings]
+        total_terms = len(set(query_terms))
+        if not terms or not total_terms:
+            return []
+
+        with self._lock:
+            lengths = self._doc_lengths()
+            n_docs = len(self._lengths)
+            avg_length = max(sum(self._lengths.values()) / n_docs, 1.0)
+            scores = np.zeros(len(lengths), dtype=np.float32)
+            matched = np.zeros(len(lengths), dtype=np.int32)
+
+            for term in terms:
+                doc_ids, tfs = self._term_arrays(term)
+                idf = np.log1p((n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_ids] / avg_length)
+                scores[doc_ids] += idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+                matched[doc_ids] += 1
+
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        placeholders = ",".join("?" * len(top))
+        with self._lock:
+            rows = dict(
+                (doc_id, (kind, article)) for doc_id, kind, article in self._db.execute(
+                    f"SELECT doc_id, kind, article FROM docs WHERE doc_id IN ({placeholders})",
+                    [int(doc_id) for doc_id in top]
+                )
+            )
+
+        return [
+            {
+                "article": json.loads(rows[int(doc_id)][1]),
+                "kind": rows[int(doc_id)][0],
+                "score": round(float(scores[doc_id]), 4),
+                "coverage": round(int(matched[doc_id]) / total_terms, 4),
+            }
+            for doc_id in top if int(doc_id) in rows
+        ]
+
+
+evidence_index = EvidenceIndex(EVIDENCE_INDEX_PATH) if EVIDENCE_INDEX_ENABLED else None
+# tokenize + tulis ke SQLite di satu thread background, tidak menambah latency request
+_indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evidence-index")
+
+
+def _add_all(articles):
+    for article in articles:
+        try:
+            evidence_index.add(article)
+        except Exception as e:
+            link = article.get("link") if isinstance(article, dict) else None
+            print(f"⚠️ Gagal index evidence {link or repr(article)[:100]}: {e}")
+
+
+def index_evidence(articles):
+    # hanya dipanggil fetch_evidence: artikel yang di-scrape server sendiri
+    articles = [article for article in (articles or []) if isinstance(article, dict)]
+    if evidence_index is None or not articles:
+        return
+    _indexer.submit(_add_all, articles)
+
+
+def local_evidence(query, k=5, exclude=None):
+    # evidence lokal yang cukup relevan untuk menggantikan Google CSE + scrape, [] kalau tidak ada.
+    # minimal LOCAL_MIN_DOCS dokumen dari domain berbeda: satu artikel saja tidak cukup jadi
+    # pengganti hasil pencarian. exclude: URL artikel yang sedang diverifikasi
+    if evidence_index is None:
+        return []
+    start = time.perf_counter()
+    excluded = canonicalize_url(exclude) if exclude else None
+    k = max(k, LOCAL_MIN_DOCS)
+    hits = evidence_index.search(query, k=k * 2)
+
+    good = []
+    domains = set()
+    for hit in hits:
+        link = hit["article"]["link"]
+        if hit["coverage"] < LOCAL_MIN_COVERAGE or hit["score"] < LOCAL_MIN_SCORE:
+            continue
+        if canonicalize_url(link) == excluded or url_domain(link) in domains:
+            continue
+        domains.add(url_domain(link))
+        good.append(hit["article"])
+    good = good[:k]
+
+    print(f"🔎 evidence lokal: {len(good)}/{len(hits)} relevan ({(time.perf_counter() - start) * 1000:.1f} ms)")
+    return good if len(good) >= LOCAL_MIN_DOCS else []
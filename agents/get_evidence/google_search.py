@@ -1,7 +1,11 @@
 import os
-from googleapiclient.discovery import build
+import re
+import hashlib
+import unicodedata
 from dotenv import load_dotenv
 from urllib.parse import urlparse
+from cache.tiered_cache import TieredCache
+from clients.http_clients import get_cse_service, execute_cse
 
 load_dotenv()
 
@@ -24,23 +28,57 @@ SOCIAL_MEDIA_DOMAINS = [
 ]
 
 
+# cache hasil CSE (sudah difilter) supaya query yang sama tidak makan kuota harian
+GOOGLE_CACHE_ENABLED = os.getenv("GOOGLE_CACHE_ENABLED", "true").lower() == "true"
+GOOGLE_CACHE_TTL = int(os.getenv("GOOGLE_CACHE_TTL", str(24 * 3600)))
+GOOGLE_CACHE_MEMORY_SIZE = int(os.getenv("GOOGLE_CACHE_MEMORY_SIZE", "1024"))
+GOOGLE_CACHE_SIZE = int(os.getenv("GOOGLE_CACHE_SIZE", "20000"))
+GOOGLE_CACHE_PATH = os.getenv("GOOGLE_CACHE_PATH", ".cache/google_search.sqlite")
+
+def _cache_namespace():
+    # ganti search engine / aturan filter -> hasil lama tidak valid
+    rules = "|".join([CSE_ID or ""] + SOCIAL_MEDIA_DOMAINS + BAD_EXT)
+    return hashlib.sha256(rules.encode("utf-8")).hexdigest()[:16]
+
+search_cache = TieredCache(
+    max_items=GOOGLE_CACHE_MEMORY_SIZE,
+    disk_path=GOOGLE_CACHE_PATH or None,
+    max_disk_items=GOOGLE_CACHE_SIZE,
+    namespace=_cache_namespace(),
+    ttl=GOOGLE_CACHE_TTL
+) if GOOGLE_CACHE_ENABLED else None
+
+def normalize_query(query):
+    # "Benarkah  PRABOWO...?" == "benarkah prabowo"
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = re.sub(r"[^\w\s]", " ", query)
+    return " ".join(query.split())
+
 def google_search(query, total_results=20):
-    service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
+    cache_key = f"{normalize_query(query)}|{total_results}"
+    if search_cache is not None:
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    service = get_cse_service()
     results = []
     start = 1
+    failed = False
 
     while len(results) < total_results:
         num = min(10, total_results - len(results))
 
         try:
-            res = service.cse().list(
+            res = execute_cse(service.cse().list(
                 q=query,
                 cx=CSE_ID,
                 num=num,
                 start=start
-            ).execute()
+            ))
         except Exception as e:
             print(f"⚠️ Google CSE error: {e}")
+            failed = True
             break
 
         items = res.get("items", [])
@@ -64,5 +102,9 @@ def google_search(query, total_results=20):
 
         start += num
 
+    # jangan cache hasil parsial karena error / kuota habis
+    if search_cache is not None and not failed:
+        search_cache.set(cache_key, results)
+
     return results
 
@@ -0,0 +1,188 @@
+import os
+import json
+from urllib.parse import urljoin
+
+# ekstraksi field artikel dari HTML. engine "lxml" (parser C, satu kali jalan hanya ke
+# tag yang dipakai) jauh lebih cepat dari engine "soup" (BeautifulSoup html.parser,
+# implementasi lama). untuk HTML yang rapi field-nya sama, tapi untuk markup rusak kedua
+# parser membangun tree yang berbeda sehingga output TIDAK selalu identik:
+# - <p> tanpa penutup: lxml menutupnya di <p> / <div> / <table> / heading / <form> berikutnya
+#   (seperti browser); html.parser menyarangkan semuanya di <p> pertama -> teks dobel
+# - </br>, </div> nyasar di dalam <p>: lxml menggabung teks di kiri-kanannya tanpa spasi
+# - <title> berisi tag: lxml mengambil isinya sebagai teks mentah, html.parser -> judul None
+# - <textarea> / CDATA di dalam <p>: lxml (raw text / dibuang), html.parser (di-parse / ikut)
+# HTML_PARSER=soup mengembalikan perilaku lama; "soup" juga fallback kalau lxml tidak
+# terpasang / gagal parse. contoh kasusnya ada di benchmarks/fixtures/html/malformed_*.html
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml").lower()
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    LXML_PARSER = lxml_html.HTMLParser(encoding="utf-8", remove_blank_text=False)
+except ImportError:
+    lxml_html = None
+
+# tag yang isi teksnya tidak ikut get_text() di BeautifulSoup
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+WANTED_TAGS = ("title", "time", "p", "meta", "script", "img")
+
+
+def extract_fields(html, url):
+    # -> {"judul", "tanggal", "content", "featured_image"}
+    if HTML_PARSER == "lxml" and lxml_html is not None:
+        try:
+            return extract_fields_lxml(html, url)
+        except (etree.ParserError, ValueError) as e:
+            print(f"⚠️ lxml gagal parse {url}: {e} → html.parser")
+    return extract_fields_soup(html, url)
+
+
+def _image_from_json_ld(scripts, url):
+    for raw in scripts:
+        try:
+            data = json.loads(raw)
+
+            if isinstance(data, dict):
+                image = data.get("image")
+                if isinstance(image, str):
+                    return urljoin(url, image)
+                if isinstance(image, dict) and "url" in image:
+                    return urljoin(url, image["url"])
+                if isinstance(image, list) and len(image) > 0:
+                    return urljoin(url, image[0])
+        except:
+            pass
+    return None
+
+
+def _image_from_img(sources, url):
+    for src in sources:
+        if not src:
+            continue
+        full_url = urljoin(url, src)
+        if full_url.endswith((".svg", ".gif")):
+            continue
+        return full_url
+    return None
+
+
+def extract_fields_soup(html, url):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    # ====== Judul ======
+    judul = soup.title.string.strip() if soup.title and soup.title.string else None
+
+    # ====== Tanggal ======
+    time_tag = soup.find("time")
+    tanggal = time_tag.get_text(strip=True) if time_tag else None
+
+    # ====== Content ======
+    paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
+    paragraphs = [p for p in paragraphs if len(p) > 50]
+
+    content = "\n".join(paragraphs) if paragraphs else ""
+
+    # ====== Featured image: og:image -> twitter:image -> JSON-LD -> <img> ======
+    featured_image = None
+
+    og = soup.find("meta", property="og:image")
+    if og and og.get("content"):
+        featured_image = urljoin(url, og["content"])
+
+    if not featured_image:
+        twitter = soup.find("meta", attrs={"name": "twitter:image"})
+        if twitter and twitter.get("content"):
+            featured_image = urljoin(url, twitter["content"])
+
+    if not featured_image:
+        scripts = [tag.string for tag in soup.find_all("script", type="application/ld+json")]
+        featured_image = _image_from_json_ld(scripts, url)
+
+    if not featured_image:
+        sources = [img.get("src") or img.get("data-src") for img in soup.find_all("img")]
+        featured_image = _image_from_img(sources, url)
+
+    return {
+        "judul": judul,
+        "tanggal": tanggal,
+        "content": content,
+        "featured_image": featured_image,
+    }
+
+
+def _strings(element):
+    # sama dengan urutan string yang dipakai BeautifulSoup.get_text()
+    if element.tag in SKIP_TEXT_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str):
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _get_text(element, separator=""):
+    return separator.join(s.strip() for s in _strings(element) if s.strip())
+
+
+def extract_fields_lxml(html, url):
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    root = lxml_html.document_fromstring(html, parser=LXML_PARSER)
+
+    title_tag = None
+    time_tag = None
+    og = None
+    twitter = None
+    paragraphs = []
+    scripts = []
+    sources = []
+
+    # satu kali jalan, hanya ke tag yang dibutuhkan
+    for element in root.iter(*WANTED_TAGS):
+        tag = element.tag
+        if tag == "p":
+            text = _get_text(element, " ")
+            if len(text) > 50:
+                paragraphs.append(text)
+        elif tag == "img":
+            sources.append(element.get("src") or element.get("data-src"))
+        elif tag == "meta":
+            if og is None and element.get("property") == "og:image":
+                og = element
+            if twitter is None and element.get("name") == "twitter:image":
+                twitter = element
+        elif tag == "script":
+            if element.get("type") == "application/ld+json":
+                scripts.append(element.text)
+        elif tag == "title":
+            if title_tag is None:
+                title_tag = element
+        elif tag == "time":
+            if time_tag is None:
+                time_tag = element
+
+    judul = title_tag.text.strip() if title_tag is not None and title_tag.text else None
+    tanggal = _get_text(time_tag) if time_tag is not None else None
+    content = "\n".join(paragraphs) if paragraphs else ""
+
+    featured_image = None
+    if og is not None and og.get("content"):
+        featured_image = urljoin(url, og.get("content"))
+    if not featured_image and twitter is not None and twitter.get("content"):
+        featured_image = urljoin(url, twitter.get("content"))
+    if not featured_image:
+        featured_image = _image_from_json_ld(scripts, url)
+    if not featured_image:
+        featured_image = _image_from_img(sources, url)
+
+    return {
+        "judul": judul,
+        "tanggal": tanggal,
+        "content": content,
+        "featured_image": featured_image,
+    }
@@ -0,0 +1,62 @@
+import os
+import time
+from agents.get_evidence.url_utils import canonicalize_url, url_domain
+from agents.get_evidence.scrape_html import domain_stats
+
+# urutkan link hasil Google berdasarkan riwayat scrape per domain supaya percobaan pertama
+# biasanya langsung berhasil; domain yang hampir selalu gagal dilewati (sesekali dicoba lagi)
+LINK_RANKING_ENABLED = os.getenv("LINK_RANKING_ENABLED", "true").lower() == "true"
+SKIP_MIN_ATTEMPTS = int(os.getenv("LINK_SKIP_MIN_ATTEMPTS", "5"))
+SKIP_BELOW_SUCCESS_RATE = float(os.getenv("LINK_SKIP_BELOW_SUCCESS_RATE", "0.1"))
+SKIP_RETRY_AFTER = int(os.getenv("LINK_SKIP_RETRY_AFTER", str(3 * 24 * 3600)))
+# latency rata-rata (detik) yang membuat skor turun jadi setengah
+LATENCY_SCALE = float(os.getenv("LINK_LATENCY_SCALE", "10"))
+# penalti kecil per posisi Google supaya domain yang belum dikenal tetap urut CSE
+POSITION_WEIGHT = 0.01
+
+
+def _score(stat, position):
+    # success rate dengan smoothing Laplace: domain baru = 0.5
+    attempts = stat["attempts"] if stat else 0
+    successes = stat["successes"] if stat else 0
+    success_rate = (successes + 1) / (attempts + 2)
+
+    quality = stat["total_quality"] / successes if successes else 0.5
+    latency = stat["total_latency"] / attempts if attempts else 0.0
+
+    return success_rate * (0.5 + 0.5 * quality) / (1 + latency / LATENCY_SCALE) - position * POSITION_WEIGHT
+
+
+def _should_skip(stat, now):
+    if not stat or stat["attempts"] < SKIP_MIN_ATTEMPTS:
+        return False
+    if stat["successes"] / stat["attempts"] >= SKIP_BELOW_SUCCESS_RATE:
+        return False
+    return now - stat["last_attempt"] < SKIP_RETRY_AFTER
+
+
+def rank_links(links):
+    # buang duplikat canonical URL, lewati domain yang selalu gagal, urutkan sisanya
+    seen = set()
+    ranked = []
+    skipped = []
+    now = time.time()
+
+    for position, url in enumerate(links):
+        key = canonicalize_url(url)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        stat = domain_stats.get(url_domain(url), "all")
+        if _should_skip(stat, now):
+            skipped.append(url)
+            continue
+        ranked.append((_score(stat, position), position, url))
+
+    if skipped:
+        print(f"⏭️ Lewati {len(skipped)} link dari domain yang sering gagal: {[url_domain(u) for u in skipped]}")
+
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    # kalau semua link dilewati, tetap coba daripada tidak ada evidence sama sekali
+    return [url for _, _, url in ranked] or skipped
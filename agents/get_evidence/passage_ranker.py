@@ -0,0 +1,154 @@
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+import numpy as np
+
+# pilih paragraf evidence yang paling relevan dengan judul/klaim (BM25, stopword Sastrawi +
+# stemming ringan berbasis aturan) supaya yang dikirim ke LLM hanya bagian yang penting, bukan
+# artikel utuh. stemmer Sastrawi penuh tidak dipakai: ±40 ms per kata baru (pure Python, lookup
+# kamus berulang) -> puluhan detik per artikel karena kosakata berita long-tail.
+PASSAGE_RANKING_ENABLED = os.getenv("PASSAGE_RANKING_ENABLED", "true").lower() == "true"
+PASSAGE_TOP_N = int(os.getenv("PASSAGE_TOP_N", "6"))
+PASSAGE_MAX_CHARS = int(os.getenv("PASSAGE_MAX_CHARS", "800"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# stemming ringan: partikel, kata ganti milik, lalu satu akhiran dan satu awalan; kata dasar
+# minimal MIN_STEM_LENGTH huruf supaya kata pendek tidak rusak
+MIN_STEM_LENGTH = 4
+_PARTICLE = re.compile(r"(lah|kah|pun)$")
+_POSSESSIVE = re.compile(r"(ku|mu|nya)$")
+_SUFFIX = re.compile(r"(kan|an|i)$")
+_PREFIX = re.compile(r"^(meng|mem|men|me|peng|pem|pen|per|pe|ber|be|ter|di|ke|se)")
+# meny-/peny- + s: "menyebarkan", "penyebaran" -> "sebar"
+_NASAL_S = re.compile(r"^(meny|peny)")
+
+_stopwords_lock = threading.Lock()
+_stopwords = None
+
+
+def _load_stopwords():
+    global _stopwords
+    if _stopwords is None:
+        with _stopwords_lock:
+            if _stopwords is None:
+                from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+                _stopwords = frozenset(StopWordRemoverFactory().get_stop_words())
+    return _stopwords
+
+
+def is_loaded():
+    return _stopwords is not None
+
+
+def warmup():
+    tokenize("pemerintah menyatakan informasi tersebut tidak benar")
+
+
+def _strip(pattern, word):
+    stripped = pattern.sub("", word)
+    return stripped if len(stripped) >= MIN_STEM_LENGTH else word
+
+
+@lru_cache(maxsize=100_000)
+def _stem(word):
+    # "pemberitaannya" / "diberitakan" -> "berita", "kebakaran" -> "bakar"; tidak selalu kata
+    # dasar yang benar, cukup konsisten antara query dan passage
+    if word.isdigit():
+        return word
+    for pattern in (_PARTICLE, _POSSESSIVE, _SUFFIX):
+        word = _strip(pattern, word)
+    if _NASAL_S.match(word):
+        stemmed = "s" + word[4:]
+        return stemmed if len(stemmed) >= MIN_STEM_LENGTH else word
+    return _strip(_PREFIX, word)
+
+
+def tokenize(text):
+    stopwords = _load_stopwords()
+    words = re.findall(r"[a-z0-9]+", unicodedata.normalize("NFKC", text or "").lower())
+    return [_stem(word) for word in words if len(word) > 1 and word not in stopwords]
+
+
+def split_passages(content):
+    # satu paragraf = satu passage; paragraf yang sangat panjang dipecah per beberapa kalimat
+    passages = []
+    for paragraph in (content or "").split("\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= PASSAGE_MAX_CHARS:
+            passages.append(paragraph)
+            continue
+
+        chunk = ""
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            if chunk and len(chunk) + len(sentence) + 1 > PASSAGE_MAX_CHARS:
+                passages.append(chunk)
+                chunk = sentence
+            else:
+                chunk = f"{chunk} {sentence}" if chunk else sentence
+        if chunk:
+            passages.append(chunk)
+    return passages
+
+
+def bm25_scores(query_terms, passages_terms):
+    # matriks tf [passage x term query] -> skor BM25 semua passage sekaligus
+    terms = list(dict.fromkeys(query_terms))
+    if not terms or not passages_terms:
+        return np.zeros(len(passages_terms))
+
+    index = {term: j for j, term in enumerate(terms)}
+    tf = np.zeros((len(passages_terms), len(terms)), dtype=np.float32)
+    for i, passage in enumerate(passages_terms):
+        for term in passage:
+            j = index.get(term)
+            if j is not None:
+                tf[i, j] += 1
+
+    lengths = np.array([len(passage) for passage in passages_terms], dtype=np.float32)
+    avg_length = max(lengths.mean(), 1.0)
+
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(passages_terms) - df + 0.5) / (df + 0.5))
+
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+    return (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def select_passages(query, news_scrape, top_n=None):
+    # evidence yang sama, tapi `content` hanya berisi top-N passage (urutan asli artikel);
+    # tiap artikel tetap menyumbang minimal passage terbaiknya
+    top_n = top_n or PASSAGE_TOP_N
+    documents = [item for item in (news_scrape or []) if item]
+    if not PASSAGE_RANKING_ENABLED or not documents:
+        return news_scrape
+
+    passages = []
+    for doc_index, item in enumerate(documents):
+        for position, passage in enumerate(split_passages(item.get("content", ""))):
+            passages.append((doc_index, position, passage))
+    if len(passages) <= top_n:
+        return news_scrape
+
+    scores = bm25_scores(tokenize(query), [tokenize(passage) for _, _, passage in passages])
+    order = np.argsort(-scores, kind="stable")
+
+    chosen = set()
+    for doc_index in range(len(documents)):
+        best = next((i for i in order if passages[i][0] == doc_index), None)
+        if best is not None:
+            chosen.add(int(best))
+    for i in order:
+        if len(chosen) >= max(top_n, len(documents)):
+            break
+        chosen.add(int(i))
+
+    selected = []
+    for doc_index, item in enumerate(documents):
+        kept = [passages[i][2] for i in sorted(chosen) if passages[i][0] == doc_index]
+        selected.append({**item, "content": "\n".join(kept)})
+    return selected
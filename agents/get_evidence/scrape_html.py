@@ -1,132 +1,197 @@
-import re
 import os
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, urljoin
+import time
+from urllib.parse import urlparse
 from dotenv import load_dotenv
+from cache.tiered_cache import TieredCache
+from agents.get_evidence.url_utils import canonicalize_url, url_domain
+from agents.get_evidence.domain_stats import DomainStats, article_quality
+from agents.get_evidence.html_extract import extract_fields
+from clients.http_clients import get_http_client
+from clients.url_guard import safe_stream, read_limited
+from agents.pipeline.deadline import DeadlineExceeded, deadline_expired, time_left
 
 load_dotenv()
 SCRAPINGBEE_API_KEY = os.getenv("SCRAPINGBEE_API_KEY")
 
-def scrape_html(url):
-    try:
-        api_url = "https://app.scrapingbee.com/api/v1/"
-        params = {
-            "api_key": SCRAPINGBEE_API_KEY,
-            "url": url,
-            "render_js": "true",
-            "block_ads": "true",
-            "wait": "4000"
-        }
-
-        response = requests.get(api_url, params=params, timeout=100)
-
-        if response.status_code != 200:
-            print("ScrapingBee error:", response.text)
-            return None
-
-        html = response.text
-        soup = BeautifulSoup(html, "html.parser")
-
-        # ====== Judul ======
-        judul = soup.title.string.strip() if soup.title and soup.title.string else None
-
-        # ====== Tanggal ======
-        time_tag = soup.find("time")
-        tanggal = time_tag.get_text(strip=True) if time_tag else None
-
-        # ====== Content ======
-        paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-        paragraphs = [p for p in paragraphs if len(p) > 50]
-
-        content = "\n".join(paragraphs) if paragraphs else ""
-
-        # ===========================================================
-        #      VALIDATION: RETURN NONE JIKA KONTEN JELEK
-        # ===========================================================
-
-        # 1. Jika JS modal (khas detik)
-        BAD_PATTERNS = [
-            "aktifkan javascript",
-            "upgrade web browser",
-            "html5 video",
-            "modal ini dapat ditutup",
-        ]
-        if any(bad in content.lower() for bad in BAD_PATTERNS):
-            print("❌ halaman modal JS → gagal scrape")
-            return None
+# cache hasil scrape per canonical URL (zstd di disk); URL gagal di-cache sebentar (negative TTL)
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() == "true"
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", str(7 * 24 * 3600)))
+SCRAPE_NEGATIVE_TTL = int(os.getenv("SCRAPE_NEGATIVE_TTL", "600"))
+SCRAPE_CACHE_MEMORY_SIZE = int(os.getenv("SCRAPE_CACHE_MEMORY_SIZE", "256"))
+SCRAPE_CACHE_SIZE = int(os.getenv("SCRAPE_CACHE_SIZE", "20000"))
+SCRAPE_CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", ".cache/scrape_html.sqlite")
+
+FAILED = {"failed": True}
+
+# tier 1: GET langsung (cepat, gratis); tier 2: ScrapingBee render JS kalau validasi konten gagal
+DIRECT_FETCH_ENABLED = os.getenv("DIRECT_FETCH_ENABLED", "true").lower() == "true"
+DIRECT_FETCH_TIMEOUT = float(os.getenv("DIRECT_FETCH_TIMEOUT", "5"))
+# halaman artikel wajar < 1-2 MB; lebih dari ini berhenti dibaca
+DIRECT_MAX_BYTES = int(os.getenv("DIRECT_MAX_BYTES", str(3 * 1024 * 1024)))
+DIRECT_MIN_SAMPLES = int(os.getenv("DIRECT_MIN_SAMPLES", "3"))
+DIRECT_MIN_SUCCESS_RATE = float(os.getenv("DIRECT_MIN_SUCCESS_RATE", "0.2"))
+DIRECT_RETRY_AFTER = int(os.getenv("DIRECT_RETRY_AFTER", str(7 * 24 * 3600)))
+DOMAIN_STATS_PATH = os.getenv("DOMAIN_STATS_PATH", ".cache/domain_stats.sqlite")
+
+DIRECT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/131.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "id-ID,id;q=0.9,en;q=0.8",
+}
+
+domain_stats = DomainStats(DOMAIN_STATS_PATH or None)
+
+scrape_cache = TieredCache(
+    max_items=SCRAPE_CACHE_MEMORY_SIZE,
+    disk_path=SCRAPE_CACHE_PATH or None,
+    max_disk_items=SCRAPE_CACHE_SIZE,
+    ttl=SCRAPE_CACHE_TTL,
+    compress=True
+) if SCRAPE_CACHE_ENABLED else None
+
+class ScrapeCancelled(Exception):
+    # pemanggil sudah tidak butuh hasilnya (scrape_limit tercapai / deadline habis); tidak di-cache
+    pass
+
+def scrape_html(url, cancel=None):
+    # cancel: threading.Event opsional; kalau sudah di-set, tier ScrapingBee (berbayar) tidak dipanggil
+    if scrape_cache is None:
+        return _scrape_html(url, cancel)
+
+    key = canonicalize_url(url)
+    cached = scrape_cache.get(key)
+    if cached == FAILED:
+        print(f"⏭️ {url} baru saja gagal di-scrape (negative cache)")
+        return None
+    if cached is not None:
+        # varian URL lain (amp/mobile/utm) -> tetap kembalikan link yang diminta
+        cached["link"] = url
+        return cached
+
+    result = _scrape_html(url, cancel)
+    if result is None:
+        scrape_cache.set(key, FAILED, ttl=SCRAPE_NEGATIVE_TTL)
+    else:
+        scrape_cache.set(key, result)
+    return result
+
+def _fetch_rendered(url):
+    # ScrapingBee + render JS: lambat & berbayar, tapi jalan untuk situs yang butuh JS
+    api_url = "https://app.scrapingbee.com/api/v1/"
+    params = {
+        "api_key": SCRAPINGBEE_API_KEY,
+        "url": url,
+        "render_js": "true",
+        "block_ads": "true",
+        "wait": "4000"
+    }
+
+    response = get_http_client().get(api_url, params=params, timeout=time_left(100))
+
+    if response.status_code != 200:
+        print("ScrapingBee error:", response.text)
+        return None
 
-        # 2. Konten terlalu pendek
-        if len(content) < 200:
-            print(f"❌ konten terlalu pendek ({len(content)} chars) → gagal scrape")
-            return None
+    return response.text
 
-        # 3. Jika judul tidak ada
-        if not judul:
-            print("❌ tidak ada judul → gagal scrape")
+def _fetch_direct(url):
+    # GET biasa; cukup untuk situs berita statis. URL bisa datang dari user -> host internal /
+    # redirect ke host internal ditolak (UnsafeURL), body dibaca streaming dengan batas ukuran & waktu total
+    with safe_stream("GET", url, timeout=time_left(DIRECT_FETCH_TIMEOUT), headers=DIRECT_HEADERS) as response:
+        if response.status_code != 200 or "html" not in response.headers.get("Content-Type", "html"):
             return None
+        body = read_limited(response, DIRECT_MAX_BYTES)
+
+    return body.decode(response.encoding or "utf-8", errors="replace")
+
+def _use_direct(domain):
+    # domain yang terbukti butuh JS langsung ke ScrapingBee, sesekali dicoba lagi
+    stat = domain_stats.get(domain, "direct")
+    if not stat or stat["attempts"] < DIRECT_MIN_SAMPLES:
+        return True
+    if stat["successes"] / stat["attempts"] >= DIRECT_MIN_SUCCESS_RATE:
+        return True
+    return time.time() - stat["last_attempt"] > DIRECT_RETRY_AFTER
+
+def _try_tier(tier, fetch, url, domain):
+    start = time.perf_counter()
+    article = None
+    try:
+        html = fetch(url)
+        if html:
+            article = extract_article(html, url)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        # timeout karena deadline request bukan salah domain -> jangan masuk statistik
+        if deadline_expired():
+            raise DeadlineExceeded(f"scrape {url}") from e
+        print(f"⚠️ Gagal scrape ({tier}) {url}: {e}")
+
+    domain_stats.record(domain, tier, article is not None, time.perf_counter() - start, article_quality(article))
+    return article
+
+def _scrape_tiers(url, domain, cancel=None):
+    if DIRECT_FETCH_ENABLED and _use_direct(domain):
+        article = _try_tier("direct", _fetch_direct, url, domain)
+        if article is not None:
+            return article
+
+    # cek lagi sebelum memakai kredit ScrapingBee: direct fetch bisa makan waktu beberapa detik
+    if cancel is not None and cancel.is_set():
+        raise ScrapeCancelled(url)
+    if deadline_expired():
+        raise DeadlineExceeded(f"scrape {url}")
+    if DIRECT_FETCH_ENABLED:
+        print(f"↪️ direct fetch gagal / dilewati → ScrapingBee ({domain})")
+    return _try_tier("rendered", _fetch_rendered, url, domain)
+
+def _scrape_html(url, cancel=None):
+    # tier "all" = hasil akhir scrape_html per domain, dipakai link_ranker
+    domain = url_domain(url)
+    start = time.perf_counter()
+    article = _scrape_tiers(url, domain, cancel)
+    domain_stats.record(domain, "all", article is not None, time.perf_counter() - start, article_quality(article))
+    return article
+
+def extract_article(html, url):
+    fields = extract_fields(html, url)
+    judul = fields["judul"]
+    tanggal = fields["tanggal"]
+    content = fields["content"]
+
+    # ===========================================================
+    #      VALIDATION: RETURN NONE JIKA KONTEN JELEK
+    # ===========================================================
+
+    # 1. Jika JS modal (khas detik)
+    BAD_PATTERNS = [
+        "aktifkan javascript",
+        "upgrade web browser",
+        "html5 video",
+        "modal ini dapat ditutup",
+    ]
+    if any(bad in content.lower() for bad in BAD_PATTERNS):
+        print("❌ halaman modal JS → gagal scrape")
+        return None
 
-        # ===========================================================
-        #                     FEATURED IMAGE ONLY
-        # ===========================================================
-
-        featured_image = None
-
-        # og:image
-        og = soup.find("meta", property="og:image")
-        if og and og.get("content"):
-            featured_image = urljoin(url, og["content"])
-
-        # twitter:image
-        if not featured_image:
-            twitter = soup.find("meta", attrs={"name": "twitter:image"})
-            if twitter and twitter.get("content"):
-                featured_image = urljoin(url, twitter["content"])
-
-        # JSON-LD
-        if not featured_image:
-            json_ld_tags = soup.find_all("script", type="application/ld+json")
-            for tag in json_ld_tags:
-                try:
-                    import json
-                    data = json.loads(tag.string)
-
-                    if isinstance(data, dict):
-                        image = data.get("image")
-                        if isinstance(image, str):
-                            featured_image = urljoin(url, image)
-                            break
-                        if isinstance(image, dict) and "url" in image:
-                            featured_image = urljoin(url, image["url"])
-                            break
-                        if isinstance(image, list) and len(image) > 0:
-                            featured_image = urljoin(url, image[0])
-                            break
-                except:
-                    pass
-
-        # Fallback gambar
-        if not featured_image:
-            for img in soup.find_all("img"):
-                src = img.get("src") or img.get("data-src")
-                if not src:
-                    continue
-                full_url = urljoin(url, src)
-                if full_url.endswith((".svg", ".gif")):
-                    continue
-                featured_image = full_url
-                break
-
-        # ====== RETURN FINAL VALID DATA ======
-        return {
-            "judul": judul,
-            "tanggal": tanggal or "Unknown",
-            "sumber": urlparse(url).netloc.replace("www.", ""),
-            "link": url,
-            "content": content,
-            "featured_image": featured_image,
-        }
+    # 2. Konten terlalu pendek
+    if len(content) < 200:
+        print(f"❌ konten terlalu pendek ({len(content)} chars) → gagal scrape")
+        return None
 
-    except Exception as e:
-        print(f"⚠️ Gagal scrape {url}: {e}")
+    # 3. Jika judul tidak ada
+    if not judul:
+        print("❌ tidak ada judul → gagal scrape")
         return None
+
+    # ====== RETURN FINAL VALID DATA ======
+    return {
+        "judul": judul,
+        "tanggal": tanggal or "Unknown",
+        "sumber": urlparse(url).netloc.replace("www.", ""),
+        "link": url,
+        "content": content,
+        "featured_image": fields["featured_image"],
+    }
@@ -0,0 +1,48 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# parameter tracking yang tidak mengubah isi artikel
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid", "_ga", "_gl",
+    "ref", "ref_src", "source", "src", "share", "amp", "amp_js_v", "usqp", "outputtype",
+    "mc_cid", "mc_eid", "cmpid", "spm", "utm",
+}
+TRACKING_PREFIXES = ("utm_", "amp_")
+
+# subdomain varian mobile/AMP dari situs yang sama
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+
+def _strip_host_prefix(host):
+    host = host.lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def url_domain(url):
+    # https://m.detik.com/... -> detik.com (kunci statistik per domain)
+    return _strip_host_prefix(urlsplit(url.strip()).hostname or "")
+
+
+def canonicalize_url(url):
+    # https://m.liputan6.com/amp/123/judul?utm_source=x#top -> https://liputan6.com/123/judul
+    parts = urlsplit(url.strip())
+
+    host = _strip_host_prefix(parts.hostname or "")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    # /amp/123/judul, /123/judul/amp, /123/judul.amp, /amp
+    segments = [s for s in parts.path.split("/") if s and s.lower() != "amp"]
+    if segments and segments[-1].lower().endswith(".amp"):
+        segments[-1] = segments[-1][:-4]
+    path = "/" + "/".join(segments)
+
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
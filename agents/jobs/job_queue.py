@@ -0,0 +1,173 @@
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from agents.jobs.job_store import JobStore
+from agents.pipeline.verification import (
+    predict_with_evidence_pipeline,
+    predict_from_url_pipeline,
+    predict_from_claim_pipeline,
+)
+
+# mode asinkron untuk verifikasi lambat (search + scrape + LLM): submit langsung dapat job id,
+# pipeline dijalankan worker pool sendiri sehingga threadpool request (/predict/) tidak ikut penuh
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", ".cache/jobs.sqlite")
+JOB_BUDGET = float(os.getenv("JOB_BUDGET", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))
+CALLBACK_RETRIES = int(os.getenv("JOB_CALLBACK_RETRIES", "3"))
+# callback dikirim executor sendiri; retry dijadwalkan ulang dengan timer, worker job tidak ikut menunggu
+CALLBACK_CONCURRENCY = int(os.getenv("JOB_CALLBACK_CONCURRENCY", "2"))
+# job running dipegang dengan lease yang diperpanjang setiap JOB_LEASE/3 detik; lease yang habis
+# (proses mati) diambil alih worker lain / proses berikutnya
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+
+
+class JobQueue:
+    # handlers: kind -> fungsi(**payload, budget=...) yang mengembalikan dict hasil
+    def __init__(self, store, handlers, concurrency=JOB_CONCURRENCY):
+        self.store = store
+        self.handlers = handlers
+        self.concurrency = max(1, concurrency)
+        # identitas proses ini sebagai pemilik lease (WEB_CONCURRENCY > 1 -> beberapa proses)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._callbacks = ThreadPoolExecutor(max_workers=max(1, CALLBACK_CONCURRENCY), thread_name_prefix="job-callback")
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self.store.purge(JOB_RETENTION)
+            recovered = self._recover()
+            if recovered:
+                print(f"♻️ {recovered} job dilanjutkan dari antrean sebelumnya")
+
+            for i in range(self.concurrency):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        # job yang sedang jalan dibiarkan; lease-nya habis lalu diambil alih proses lain / berikutnya
+        self._stopping.set()
+        for _ in range(self.concurrency):
+            self._queue.put(None)
+
+    def submit(self, kind, payload, callback_url=None):
+        if kind not in self.handlers:
+            raise ValueError(f"Jenis job tidak dikenal: {kind}")
+        job = self.store.create(kind, payload, callback_url)
+        self._enqueue(job["id"])
+        return job
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "queued_in_memory": self._queue.qsize(),
+            "workers_alive": sum(thread.is_alive() for thread in self._threads[:self.concurrency]),
+            "jobs": self.store.counts(),
+        }
+
+    def _enqueue(self, job_id):
+        with self._lock:
+            if job_id in self._pending:
+                return False
+            self._pending.add(job_id)
+        self._queue.put(job_id)
+        return True
+
+    def _recover(self):
+        # job queued milik siapa pun + job yang lease-nya habis; claim atomik mencegah dobel eksekusi
+        return sum(self._enqueue(job_id) for job_id in self.store.recover(JOB_MAX_ATTEMPTS))
+
+    def _heartbeat(self):
+        while not self._stopping.wait(JOB_LEASE / 3):
+            try:
+                self.store.renew(self.owner, JOB_LEASE)
+                self._recover()
+            except Exception as e:
+                print(f"⚠️ heartbeat job gagal: {e}")
+
+    def _work(self):
+        while not self._stopping.is_set():
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            with self._lock:
+                self._pending.discard(job_id)
+            self._run(job_id)
+
+    def _run(self, job_id):
+        # proses / worker lain mungkin sudah mengambil job ini
+        if not self.store.claim(job_id, self.owner, JOB_LEASE):
+            return
+        job = self.store.get(job_id)
+
+        start = time.perf_counter()
+        try:
+            payload = dict(job["payload"])
+            payload.setdefault("budget", JOB_BUDGET)
+            result = self.handlers[job["kind"]](**payload)
+            finished = self.store.mark_done(job_id, self.owner, result)
+            print(f"✅ job {job['kind']} {job_id} selesai ({time.perf_counter() - start:.1f} s)")
+        except Exception as e:
+            finished = self.store.mark_failed(job_id, self.owner, str(e) or type(e).__name__)
+            print(f"❌ job {job['kind']} {job_id} gagal: {e}")
+
+        if not finished:
+            print(f"⚠️ lease job {job_id} sudah diambil alih proses lain, hasil diabaikan")
+            return
+        if job["callback_url"]:
+            self._callbacks.submit(self._callback, self.store.get(job_id))
+
+    def _callback(self, job, attempt=1):
+        from clients.url_guard import safe_stream, UnsafeURL
+
+        retries = max(1, CALLBACK_RETRIES)
+        try:
+            # callback_url dari user: dicek ulang saat kirim (DNS bisa berubah) dan dikirim ke IP
+            # hasil cek itu, redirect tidak diikuti, body response tidak dibaca
+            with safe_stream("POST", job["callback_url"], timeout=CALLBACK_TIMEOUT, max_redirects=0, json=job) as response:
+                status_code = response.status_code
+            if status_code < 300:
+                self.store.mark_callback(job["id"], f"delivered ({status_code})")
+                return
+            status = f"HTTP {status_code}"
+        except UnsafeURL as e:
+            print(f"⚠️ callback job {job['id']} ditolak: {e}")
+            self.store.mark_callback(job["id"], f"failed: {e}")
+            return
+        except Exception as e:
+            status = str(e) or type(e).__name__
+
+        print(f"⚠️ callback job {job['id']} gagal (percobaan {attempt}/{retries}): {status}")
+        if attempt >= retries:
+            self.store.mark_callback(job["id"], f"failed: {status}")
+            return
+
+        timer = threading.Timer(2 ** attempt, self._callbacks.submit, args=(self._callback, job, attempt + 1))
+        timer.daemon = True
+        timer.start()
+
+
+job_queue = JobQueue(JobStore(JOB_STORE_PATH), {
+    "predict_with_evidence": predict_with_evidence_pipeline,
+    "predict_from_url": predict_from_url_pipeline,
+    "predict_from_claim": predict_from_claim_pipeline,
+})
@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# penyimpanan job verifikasi di SQLite supaya antrean & hasil tetap ada setelah restart
+# status: queued -> running -> done / failed. beberapa proses (WEB_CONCURRENCY) memakai file yang
+# sama: job di-claim secara atomik dan dipegang dengan lease yang diperpanjang pemiliknya
+
+
+class JobStore:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT, payload TEXT, status TEXT, result TEXT, error TEXT, "
+            "callback_url TEXT, callback_status TEXT, attempts INTEGER DEFAULT 0, "
+            "created_at REAL, started_at REAL, finished_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        # owner = proses yang menjalankan job, lease_until diperpanjang selama proses itu hidup
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self._db.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+        self._db.commit()
+
+    def create(self, kind, payload, callback_url=None):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, payload, status, callback_url, created_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload, ensure_ascii=False), callback_url, time.time())
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def claim(self, job_id, owner, lease):
+        # atomik antar worker/proses: hanya satu yang berhasil mengubah queued -> running
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'running', owner = ?, lease_until = ?, started_at = ?, attempts = attempts + 1 "
+                "WHERE id = ? AND status = 'queued'",
+                (owner, now + lease, now, job_id)
+            )
+            self._db.commit()
+        return cursor.rowcount == 1
+
+    def renew(self, owner, lease):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = 'running'",
+                (time.time() + lease, owner)
+            )
+            self._db.commit()
+
+    def mark_done(self, job_id, owner, result):
+        # hanya pemilik lease; job yang lease-nya sudah diambil alih proses lain tidak ditimpa
+        return self._update_owned(job_id, owner, "status = 'done', result = ?, error = NULL, finished_at = ?",
+                                  json.dumps(result, ensure_ascii=False), time.time())
+
+    def mark_failed(self, job_id, owner, error):
+        return self._update_owned(job_id, owner, "status = 'failed', error = ?, finished_at = ?", error, time.time())
+
+    def mark_callback(self, job_id, callback_status):
+        self._update(job_id, "callback_status = ?", callback_status)
+
+    def recover(self, max_attempts):
+        # job running yang lease-nya habis (proses pemiliknya mati / macet) dikembalikan ke antrean,
+        # kecuali sudah terlalu sering; job yang masih dipegang worker hidup tidak disentuh
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'dihentikan restart terlalu sering', finished_at = ? "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?) AND attempts >= ?",
+                (now, now, max_attempts)
+            )
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, lease_until = NULL "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (now,)
+            )
+            self._db.commit()
+            rows = self._db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [row["id"] for row in rows]
+
+    def purge(self, older_than):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - older_than,)
+            )
+            self._db.commit()
+
+    def counts(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def _update_owned(self, job_id, owner, assignments, *values):
+        with self._lock:
+            cursor = self._db.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND owner = ? AND status = 'running'",
+                (*values, job_id, owner)
+            )
+            self._db.commit()
+        return cursor.rowcount == 1
+
+    def _update(self, job_id, assignments, *values):
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values, job_id))
+            self._db.commit()
+
+    @staticmethod
+    def _to_job(row):
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"]) if job["payload"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
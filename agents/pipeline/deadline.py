@@ -0,0 +1,81 @@
+import os
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# batas waktu per request (detik). bisa diminta client lewat header X-Request-Timeout,
+# dibatasi MAX_REQUEST_BUDGET. deadline ikut ke thread stage / scrape lewat contextvars,
+# jadi GPT, ScrapingBee & direct fetch memotong timeout-nya ke sisa waktu request.
+REQUEST_BUDGET = float(os.getenv("REQUEST_BUDGET", "60"))
+MAX_REQUEST_BUDGET = float(os.getenv("MAX_REQUEST_BUDGET", "300"))
+MIN_REQUEST_BUDGET = 1.0
+
+# budget maksimum per jenis stage (tetap dipotong sisa waktu request)
+STAGE_BUDGETS = {
+    "search": float(os.getenv("SEARCH_BUDGET", "10")),
+    "scrape": float(os.getenv("SCRAPE_BUDGET", "25")),
+    "bert": float(os.getenv("BERT_BUDGET", "15")),
+    "rank": float(os.getenv("RANK_BUDGET", "1")),
+    "llm": float(os.getenv("LLM_BUDGET", "40")),
+}
+
+_current = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    def __init__(self, budget=None):
+        # nan lolos min/max (perbandingan selalu False) -> budget tidak valid pakai default
+        budget = REQUEST_BUDGET if budget is None or not math.isfinite(budget) else budget
+        self.budget = min(max(float(budget), MIN_REQUEST_BUDGET), MAX_REQUEST_BUDGET)
+        self.expires_at = time.monotonic() + self.budget
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current_deadline():
+    return _current.get()
+
+
+def time_left(cap=None):
+    # sisa waktu request (dipotong `cap`); None kalau tidak ada deadline dan tanpa cap
+    deadline = _current.get()
+    if deadline is None:
+        return cap
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded("batas waktu request habis")
+    return min(cap, remaining) if cap is not None else remaining
+
+
+def deadline_expired():
+    deadline = _current.get()
+    return deadline is not None and deadline.expired()
+
+
+def parse_budget(header_value):
+    # "30" / "30s" / "1500ms" -> detik; nilai tidak valid (termasuk nan / inf) -> pakai default
+    if not header_value:
+        return None
+    value = header_value.strip().lower()
+    try:
+        budget = float(value[:-2]) / 1000 if value.endswith("ms") else float(value.rstrip("s"))
+    except ValueError:
+        return None
+    return budget if math.isfinite(budget) else None
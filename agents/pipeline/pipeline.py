@@ -0,0 +1,110 @@
+import time
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from agents.pipeline.deadline import DeadlineExceeded, current_deadline
+
+
+class Stage:
+    # fn dipanggil dengan hasil stage di `deps` sebagai keyword argument.
+    # timeout (detik) dipotong sisa deadline request; kalau habis / DeadlineExceeded,
+    # hasil stage diganti fallback(**kwargs) atau pipeline gagal kalau tidak ada fallback
+    def __init__(self, name, fn, deps=(), timeout=None, fallback=None):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.timeout = timeout
+        self.fallback = fallback
+
+
+class StageResults(dict):
+    # dict nama stage -> hasil, plus `skipped`: nama stage -> alasan dipakai fallback
+    def __init__(self):
+        super().__init__()
+        self.skipped = {}
+
+
+def run_stages(stages, max_workers=None, on_stage_done=None):
+    # jalankan stage yang dependensinya sudah selesai secara paralel.
+    # on_stage_done(nama, hasil, alasan_skip) dipanggil begitu tiap stage selesai (untuk streaming)
+    pending = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [dep for dep in stage.deps if dep not in pending]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} butuh stage yang tidak ada: {unknown}")
+
+    deadline = current_deadline()
+    results = StageResults()
+    timings = {}
+    running = {}
+    started = {}
+    expires = {}
+
+    def degrade(stage, kwargs, reason):
+        if stage.fallback is None:
+            raise DeadlineExceeded(f"stage {stage.name}: {reason}")
+        print(f"⏰ stage {stage.name} dilewati ({reason}) → fallback")
+        results.skipped[stage.name] = reason
+        results[stage.name] = stage.fallback(**kwargs)
+        if on_stage_done:
+            on_stage_done(stage.name, results[stage.name], reason)
+
+    # executor tidak di-`with`: stage yang lewat batas waktu dibiarkan selesai di background
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(stages), thread_name_prefix="stage")
+    try:
+        while pending or running:
+            # ulangi sampai tidak ada stage baru yang siap (stage yang langsung di-fallback membuka dependennya)
+            progressed = True
+            while progressed:
+                progressed = False
+                for name, stage in list(pending.items()):
+                    if not all(dep in results for dep in stage.deps):
+                        continue
+                    del pending[name]
+                    progressed = True
+                    kwargs = {dep: results[dep] for dep in stage.deps}
+
+                    timeout = stage.timeout
+                    if deadline is not None:
+                        if deadline.expired():
+                            degrade(stage, kwargs, "deadline")
+                            continue
+                        timeout = min(timeout, deadline.remaining()) if timeout is not None else deadline.remaining()
+
+                    started[name] = time.perf_counter()
+                    if timeout is not None:
+                        expires[name] = started[name] + timeout
+                    # copy_context: deadline request ikut ke thread stage
+                    future = executor.submit(copy_context().run, stage.fn, **kwargs)
+                    running[future] = (stage, kwargs)
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Dependency stage melingkar: {list(pending)}")
+                break
+
+            now = time.perf_counter()
+            waits = [expires[stage.name] - now for stage, _ in running.values() if stage.name in expires]
+            done, _ = wait(running, timeout=max(0, min(waits)) if waits else None, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage, kwargs = running.pop(future)
+                timings[stage.name] = round(time.perf_counter() - started[stage.name], 3)
+                try:
+                    results[stage.name] = future.result()
+                except DeadlineExceeded:
+                    degrade(stage, kwargs, "deadline")
+                    continue
+                if on_stage_done:
+                    on_stage_done(stage.name, results[stage.name], None)
+
+            now = time.perf_counter()
+            for future, (stage, kwargs) in list(running.items()):
+                if stage.name in expires and now >= expires[stage.name]:
+                    del running[future]
+                    timings[stage.name] = round(now - started[stage.name], 3)
+                    degrade(stage, kwargs, "timeout")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    print(f"⏱️ pipeline stages: {timings}" + (f" | dilewati: {results.skipped}" if results.skipped else ""))
+    return results
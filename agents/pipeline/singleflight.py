@@ -0,0 +1,65 @@
+import copy
+import threading
+from concurrent.futures import Future, TimeoutError
+from agents.pipeline.deadline import DeadlineExceeded
+
+
+class SingleFlight:
+    # request identik yang datang saat eksekusi yang sama masih jalan ikut menunggu
+    # hasil eksekusi itu (tidak scrape / search / panggil LLM ulang)
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._waiters = {}
+
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    def do(self, key, fn, timeout=None):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._waiters[key] = 0
+                self.executions += 1
+            else:
+                self._waiters[key] += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, self._waiters[key])
+
+        if not leader:
+            print(f"🔗 {self.name}: menunggu eksekusi yang sedang jalan ({key})")
+            # salinan supaya caller tidak saling mengubah dict hasil yang sama;
+            # yang menunggu tetap dibatasi deadline-nya sendiri
+            try:
+                return copy.deepcopy(future.result(timeout=timeout))
+            except TimeoutError:
+                raise DeadlineExceeded(f"{self.name}: batas waktu habis menunggu eksekusi yang sedang jalan")
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+                del self._waiters[key]
+
+    def stats(self):
+        with self._lock:
+            total = self.executions + self.coalesced
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalesced_rate": round(self.coalesced / total, 4) if total else 0,
+                "in_flight": len(self._calls),
+                "max_waiters": self.max_waiters,
+            }
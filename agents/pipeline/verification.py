@@ -0,0 +1,362 @@
+import queue
+import threading
+from contextvars import copy_context
+from agents.predict.predict import (
+    classify_berita, classify_berita_with_embedding, classify_berita_long_with_embedding, advance_classify_berita
+)
+from agents.get_evidence.google_search import google_search, normalize_query
+from agents.get_evidence.scrape_html import scrape_html
+from agents.get_evidence.evidence_fetcher import fetch_evidence
+from agents.get_evidence.url_utils import canonicalize_url
+from agents.get_evidence.passage_ranker import select_passages
+from agents.get_evidence.evidence_index import local_evidence
+from agents.similar.similar_news import find_similar, remember
+from agents.explanation.explanation import explanation
+from agents.claim_check.claim_check import claim_check
+from agents.pipeline.pipeline import Stage, run_stages
+from agents.pipeline.singleflight import SingleFlight
+from agents.pipeline.deadline import Deadline, DeadlineExceeded, STAGE_BUDGETS
+
+TOTAL_RESULTS = 10
+SCRAPE_LIMIT = 1
+
+# URL / klaim yang sama dan masih diproses tidak dijalankan dua kali (viral -> banyak request identik)
+url_flight = SingleFlight("predict_from_url")
+claim_flight = SingleFlight("predict_from_claim")
+
+
+def coalescing_stats():
+    return {flight.name: flight.stats() for flight in (url_flight, claim_flight)}
+
+
+def bert_only_classification(classification, **_):
+    # fallback kalau LLM tidak sempat jalan: pakai hasil IndoBERT apa adanya
+    return {
+        "final_label": classification.get("label", "unknown"),
+        "final_confidence": classification.get("confidence", 0),
+        "source": "indobert",
+    }
+
+
+def skipped_explanation(**_):
+    return None
+
+
+def _classification_stages(classify, title, content):
+    # classify() -> (hasil IndoBERT, embedding) dari satu forward pass. stage "similar" memakai
+    # embedding itu untuk mencari berita serupa yang evidence / verdict-nya bisa dipakai lagi.
+    # return (dict berisi "vector" setelah stage selesai -> remember(), daftar stage)
+    embedding = {}
+
+    def run():
+        result, embedding["vector"] = classify()
+        return result
+
+    return embedding, [
+        Stage("classification", run, timeout=STAGE_BUDGETS["bert"]),
+        Stage(
+            "similar",
+            lambda classification: find_similar(embedding.get("vector"), title, content, classification.get("label")),
+            deps=["classification"],
+            fallback=lambda classification: None,
+        ),
+    ]
+
+
+def _evidence_stages(query, exclude=None, similar=False):
+    # index lokal -> Google CSE jalan langsung (paralel dengan IndoBERT); scrape menunggu stage
+    # "similar" (kalau similar=True) supaya evidence berita serupa bisa menggantikan scrape
+    # exclude: URL artikel yang sedang diverifikasi (jangan jadi evidence untuk dirinya sendiri)
+    def links(local):
+        return [item["link"] for item in local] if local else google_search(query, total_results=TOTAL_RESULTS)
+
+    return [
+        Stage("local", lambda: local_evidence(query, k=SCRAPE_LIMIT, exclude=exclude), fallback=lambda: []),
+        Stage("links", links, deps=["local"], timeout=STAGE_BUDGETS["search"], fallback=lambda local: []),
+        _scrape_stage(exclude, similar),
+    ]
+
+
+def _scrape_stage(exclude=None, similar=False):
+    def scrape(links, local, similar=None):
+        if similar:
+            excluded = canonicalize_url(exclude) if exclude else None
+            borrowed = [
+                item for item in similar["payload"]["evidence_scraped"]
+                if canonicalize_url(item.get("link", "")) != excluded
+            ]
+            if borrowed:
+                return borrowed
+        return local or fetch_evidence(links, scrape_limit=SCRAPE_LIMIT)
+
+    return Stage(
+        "scraped",
+        scrape,
+        deps=["links", "local"] + (["similar"] if similar else []),
+        timeout=STAGE_BUDGETS["scrape"],
+        fallback=lambda links, local, **_: local,
+    )
+
+
+def _llm_stages(title, content, explanation_input="classification", emit=None, query=None, reuse=False):
+    # explanation_input: hasil stage yang dijelaskan LLM (IndoBERT atau advance classification)
+    # emit: kalau ada, teks explanation dikirim per potongan selama LLM menulis
+    # LLM hanya menerima passage evidence yang paling relevan dengan `query` (default judul)
+    # reuse: stage "similar" lolos cek verdict reuse -> verdict & explanation lama, LLM tidak dipanggil
+    # stage explanation sudah di-fallback (timeout) -> delta berikutnya tidak dikirim lagi dan
+    # stream LLM yang masih jalan di background dihentikan (tidak terus memakai token)
+    fallen_back = threading.Event()
+
+    def on_delta(text):
+        if fallen_back.is_set():
+            raise DeadlineExceeded("stage explanation sudah di-fallback")
+        emit("explanation_delta", {"text": text})
+
+    def explanation_fallback(**kwargs):
+        fallen_back.set()
+        return skipped_explanation(**kwargs)
+
+    def reused(similar, field):
+        return similar["payload"][field] if similar and similar.get("reuse") else None
+
+    def advance(classification, passages, links, similar=None):
+        verdict = reused(similar, "classification")
+        if verdict is not None:
+            return verdict
+        return advance_classify_berita(
+            classification=classification,
+            news_scrape=passages,
+            title=title,
+            evidence_link=links,
+            content=content
+        )
+
+    def explain(passages, links, similar=None, **results):
+        text = reused(similar, "explanation")
+        if text is not None:
+            if emit:
+                emit("explanation_delta", {"text": text})
+            return text
+        return explanation(
+            classification=results[explanation_input],
+            news_scrape=passages,
+            title=title,
+            evidence_link=links,
+            content=content,
+            on_delta=on_delta if emit else None
+        )
+
+    deps = ["classification", "passages", "links"] + (["similar"] if reuse else [])
+    explanation_deps = [explanation_input] + [dep for dep in deps if dep != explanation_input]
+    return [
+        Stage(
+            "passages",
+            lambda scraped: select_passages(query or title, scraped),
+            deps=["scraped"],
+            # ranking normalnya beberapa ms; kalau lambat, evidence utuh (dipotong prompt_builder)
+            timeout=STAGE_BUDGETS["rank"],
+            fallback=lambda scraped: scraped,
+        ),
+        Stage(
+            "advance_classification",
+            advance,
+            deps=deps,
+            timeout=STAGE_BUDGETS["llm"],
+            fallback=bert_only_classification,
+        ),
+        Stage(
+            "explanation",
+            explain,
+            deps=explanation_deps,
+            timeout=STAGE_BUDGETS["llm"],
+            fallback=explanation_fallback,
+        ),
+    ]
+
+
+def _response(url, title, content, results):
+    similar = results.get("similar")
+    reused = similar if similar and similar.get("reuse") else None
+    return {
+        "url": url,
+        "title": title,
+        "content": content,
+        "classification": results["advance_classification"],
+        "evidence_links": reused["payload"]["evidence_links"] if reused else results["links"],
+        "evidence_scraped": results["scraped"],
+        "explanation": results["explanation"],
+        "skipped_stages": results.skipped,
+        # similar_to: hanya evidence yang dipinjam; reused_from: verdict + explanation juga
+        "similar_to": None if reused else _similar_to(similar),
+        "reused_from": _similar_to(reused),
+    }
+
+
+def _similar_to(match):
+    if not match:
+        return None
+    return {
+        "url": match["payload"].get("url", ""),
+        "title": match["payload"].get("title", ""),
+        "similarity": match["similarity"],
+    }
+
+
+def _stage_events(emit):
+    # hasil tiap stage langsung dikirim sebagai event bernama sama dengan stagenya
+    if emit is None:
+        return None
+    return lambda name, result, skipped: emit(name, {"result": result, "skipped": skipped})
+
+
+def predict_with_evidence_pipeline(title, content, budget=None, emit=None):
+    with Deadline(budget).activate():
+        # IndoBERT jalan bersamaan dengan index lokal + Google CSE; berita serupa (dari embedding
+        # IndoBERT) bisa menggantikan scrape / LLM. dua panggilan LLM jalan bareng
+        embedding, classification_stages = _classification_stages(
+            lambda: classify_berita_with_embedding(title, content), title, content
+        )
+        stages = classification_stages + _evidence_stages(title, similar=True) + _llm_stages(
+            title, content, emit=emit, reuse=True
+        )
+        results = run_stages(stages, on_stage_done=_stage_events(emit))
+
+    scraped = results["scraped"]
+    response = _response(scraped[0].get("link", "") if scraped else "", title, content, results)
+    remember(title, content, response, embedding.get("vector"), results["classification"].get("label"))
+    return response
+
+
+def predict_from_url_pipeline(url, budget=None):
+    deadline = Deadline(budget)
+    with deadline.activate():
+        result = url_flight.do(canonicalize_url(url), lambda: _predict_from_url(url), timeout=deadline.remaining())
+    # varian URL (amp/utm/m.) ikut hasil yang sama, tapi tetap kembalikan URL yang diminta
+    if "url" in result:
+        result["url"] = url
+    return result
+
+
+def _predict_from_url(url, emit=None):
+    # 1. Scrape artikel dari URL input
+    scraped_main = scrape_html(url)
+    if not scraped_main or scraped_main.get("content") == "Tidak berhasil ekstrak isi artikel":
+        return {
+            "error": "Gagal mengambil artikel dari URL",
+            "url": url
+        }
+
+    title = scraped_main.get("judul", "")
+    content = scraped_main.get("content", "")
+    if emit:
+        emit("article", {"result": scraped_main, "skipped": None})
+
+    # 2. IndoBERT (sliding window) paralel dengan index lokal / Google Search; scrape / LLM bisa
+    #    digantikan berita serupa
+    # 3. explanation memakai hasil advance classification -> tetap berurutan
+    embedding, classification_stages = _classification_stages(
+        lambda: classify_berita_long_with_embedding(title, content), title, content
+    )
+    stages = classification_stages + _evidence_stages(title, exclude=url, similar=True) + _llm_stages(
+        title, content, explanation_input="advance_classification", emit=emit, reuse=True
+    )
+    results = run_stages(stages, on_stage_done=_stage_events(emit))
+
+    response = _response(url, title, content, results)
+    remember(title, content, response, embedding.get("vector"), results["classification"].get("label"))
+    return response
+
+
+def stream_predict_with_evidence(title, content, budget=None):
+    return _stream(lambda emit: predict_with_evidence_pipeline(title, content, budget=budget, emit=emit))
+
+
+def stream_predict_from_url(url, budget=None):
+    # tanpa single-flight: tiap stream butuh event-nya sendiri
+    def run(emit):
+        with Deadline(budget).activate():
+            return _predict_from_url(url, emit=emit)
+    return _stream(run)
+
+
+def _stream(run):
+    # pipeline jalan di thread sendiri, event (nama, data) dikirim lewat queue begitu siap;
+    # event terakhir "result" (response lengkap seperti endpoint biasa) atau "error"
+    events = queue.Queue()
+
+    def emit(event, data):
+        events.put((event, data))
+
+    def worker():
+        try:
+            emit("result", run(emit))
+        except DeadlineExceeded as e:
+            emit("error", {"status": 504, "detail": f"Batas waktu request habis: {e}"})
+        except Exception as e:
+            print(f"❌ Stream pipeline gagal: {e}")
+            emit("error", {"status": 500, "detail": str(e)})
+        finally:
+            events.put(None)
+
+    threading.Thread(target=copy_context().run, args=(worker,), daemon=True, name="stream-pipeline").start()
+
+    while True:
+        item = events.get()
+        if item is None:
+            return
+        yield item
+
+
+def predict_from_claim_pipeline(claim, budget=None):
+    deadline = Deadline(budget)
+    with deadline.activate():
+        return claim_flight.do(normalize_query(claim), lambda: _predict_from_claim(claim), timeout=deadline.remaining())
+
+
+def _unverified(links, reason):
+    return {
+        "url": "",
+        "title": "",
+        "content": "",
+        "classification": {
+            "final_label": "unknown",
+            "final_confidence": 0,
+            "error": reason
+        },
+        "evidence_links": links,
+        "evidence_scraped": [],
+        "explanation": reason
+    }
+
+
+def _predict_from_claim(claim):
+    evidence = run_stages(_evidence_stages(claim)[:2])
+    local, links = evidence["local"], evidence["links"]
+
+    try:
+        claim_checked = claim_check(claim, links)
+    except DeadlineExceeded:
+        return _unverified(links, "Claim tidak sempat diverifikasi: batas waktu habis")
+
+    if "sesuai" not in claim_checked.lower():
+        return _unverified(links, "Claim tidak dapat diverifikasi dengan sumber yang ada: " + claim_checked)
+
+    scraped = run_stages([
+        Stage("local", lambda: local),
+        Stage("links", lambda: links),
+        _scrape_stage(),
+    ])["scraped"]
+    if not scraped:
+        return _unverified(links, "Tidak ada berita referensi yang berhasil di-scrape")
+
+    title = scraped[0].get("judul", "")
+    content = scraped[0].get("content", "")
+
+    # explanation memakai hasil advance classification -> tetap berurutan
+    results = run_stages([
+        Stage("classification", lambda: classify_berita(title, content), timeout=STAGE_BUDGETS["bert"]),
+        Stage("links", lambda: links),
+        Stage("scraped", lambda: scraped),
+    ] + _llm_stages(title, content, explanation_input="advance_classification", query=claim))
+
+    return _response(links[0] if links else "", title, content, results)
@@ -0,0 +1,184 @@
+import os
+import torch
+
+# runtime untuk forward pass IndoBERT; dipilih sekali saat startup lewat INFERENCE_BACKEND
+# semua backend menerima dict tensor hasil tokenizer dan mengembalikan logits (torch.Tensor)
+
+INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def _model_inputs(inputs):
+    # urutan argumen tetap untuk graph hasil trace/export
+    token_type_ids = inputs.get("token_type_ids")
+    if token_type_ids is None:
+        token_type_ids = torch.zeros_like(inputs["input_ids"])
+    return [inputs["input_ids"], inputs["attention_mask"], token_type_ids]
+
+
+class InferenceBackend:
+    name = "base"
+
+    def __call__(self, inputs):
+        raise NotImplementedError
+
+    def with_hidden(self, inputs):
+        # (logits, hidden state terakhir) dari satu forward pass; graph export hanya
+        # mengeluarkan logits -> hidden None
+        return self(inputs), None
+
+
+def _logits_and_hidden(model, inputs):
+    # forward *ForSequenceClassification dipecah manual: encoder -> head klasifikasi.
+    # output_hidden_states=True menahan output semua layer (13 tensor) sampai pass selesai,
+    # padahal embedding hanya butuh layer terakhir
+    if getattr(model.base_model, "pooler", None) is None or not hasattr(model, "classifier"):
+        # head bukan gaya BERT (pooler -> dropout -> classifier)
+        output = model(**inputs, output_hidden_states=True)
+        return output.logits, output.hidden_states[-1]
+    base = model.base_model(**inputs)
+    logits = model.classifier(model.dropout(base.pooler_output))
+    return logits, base.last_hidden_state
+
+
+class EagerBackend(InferenceBackend):
+    name = "eager"
+
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, inputs):
+        with torch.inference_mode():
+            return self.model(**inputs).logits
+
+    def with_hidden(self, inputs):
+        with torch.inference_mode():
+            return _logits_and_hidden(self.model, inputs)
+
+
+class TorchScriptBackend(InferenceBackend):
+    name = "torchscript"
+
+    def __init__(self, path=None, model=None):
+        if path and os.path.exists(path):
+            self.module = torch.jit.load(path, map_location="cpu")
+        elif model is not None:
+            # belum di-export -> trace saat startup
+            self.module = trace_model(model)
+        else:
+            raise FileNotFoundError(f"❌ TorchScript model tidak ditemukan: {path}")
+        self.module = torch.jit.freeze(self.module.eval())
+
+    def __call__(self, inputs):
+        with torch.inference_mode():
+            return self.module(*_model_inputs(inputs))[0]
+
+
+class CompiledBackend(InferenceBackend):
+    name = "compile"
+
+    def __init__(self, model):
+        self.model = torch.compile(model, dynamic=True)
+        # graph terpisah untuk pass yang juga mengeluarkan embedding (bobot tetap dipakai bersama)
+        self._with_hidden = torch.compile(lambda inputs: _logits_and_hidden(model, inputs), dynamic=True)
+
+    def __call__(self, inputs):
+        with torch.inference_mode():
+            return self.model(**inputs).logits
+
+    def with_hidden(self, inputs):
+        with torch.inference_mode():
+            return self._with_hidden(dict(inputs))
+
+
+class OnnxBackend(InferenceBackend):
+    name = "onnx"
+
+    def __init__(self, path, num_threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("❌ INFERENCE_BACKEND=onnx butuh package onnxruntime")
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ ONNX model tidak ditemukan: {path} (jalankan scripts/export_model.py)")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, inputs):
+        values = dict(zip(INPUT_NAMES, _model_inputs(inputs)))
+        feed = {name: values[name].numpy().astype("int64") for name in self.input_names}
+        logits = self.session.run(None, feed)[0]
+        return torch.from_numpy(logits)
+
+
+def example_inputs(tokenizer, texts=None):
+    texts = texts or ["contoh judul berita\n\ncontoh isi berita untuk tracing"]
+    return tokenizer(texts, return_tensors="pt", truncation=True, padding=True, max_length=512)
+
+
+def trace_model(model, inputs=None):
+    # model harus di-load dengan torchscript=True supaya output berupa tuple
+    if inputs is None:
+        inputs = {
+            "input_ids": torch.ones(1, 16, dtype=torch.long),
+            "attention_mask": torch.ones(1, 16, dtype=torch.long),
+            "token_type_ids": torch.zeros(1, 16, dtype=torch.long),
+        }
+    args = tuple(_model_inputs(inputs))
+    with torch.no_grad():
+        return torch.jit.trace(model.eval(), args, strict=False)
+
+
+def quantize_onnx(path, output=None):
+    # dynamic int8 untuk bobot MatMul/Gemm graph ONNX (padanan QUANTIZATION=int8 di torch);
+    # hasilnya disimpan di samping model fp32 dan dipakai ulang selama model fp32 tidak berubah
+    output = output or os.getenv("ONNX_INT8_MODEL_PATH", os.path.splitext(path)[0] + ".int8.onnx")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"❌ ONNX model tidak ditemukan: {path} (jalankan scripts/export_model.py)")
+    if os.path.exists(output) and os.path.getmtime(output) >= os.path.getmtime(path):
+        return output
+
+    try:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+    except ImportError:
+        raise ImportError("❌ QUANTIZATION=int8 dengan INFERENCE_BACKEND=onnx butuh onnxruntime (+ onnx)")
+
+    # tulis ke file sementara lalu rename: worker lain tidak membaca file setengah jadi
+    tmp = f"{output}.{os.getpid()}.tmp"
+    quantize_dynamic(path, tmp, weight_type=QuantType.QInt8)
+    os.replace(tmp, output)
+    print(f"✅ ONNX int8: {output}")
+    return output
+
+
+def create_backend(name, model_dir, load_model, quantization="none"):
+    # load_model(**kwargs) -> AutoModelForSequenceClassification (sudah eval, sudah di-quantize
+    # sesuai QUANTIZATION); backend yang memuat file export sendiri menangani quantization di sini
+    name = name.lower()
+
+    if name == "eager":
+        return EagerBackend(load_model())
+    if name == "torchscript":
+        path = os.getenv("TORCHSCRIPT_MODEL_PATH", os.path.join(model_dir, "model.torchscript.pt"))
+        model = None if os.path.exists(path) else load_model(torchscript=True)
+        if model is None and quantization != "none":
+            print(f"⚠️ QUANTIZATION={quantization} tidak diterapkan ke {path} (hasil export fp32); "
+                  f"hapus file itu supaya model di-trace dari model ter-quantize saat startup")
+        return TorchScriptBackend(path, model)
+    if name == "compile":
+        return CompiledBackend(load_model())
+    if name == "onnx":
+        path = os.getenv("ONNX_MODEL_PATH", os.path.join(model_dir, "model.onnx"))
+        if quantization == "int8":
+            path = quantize_onnx(path)
+        elif quantization != "none":
+            raise ValueError(f"❌ QUANTIZATION tidak dikenal: {quantization}")
+        return OnnxBackend(path, num_threads=torch.get_num_threads())
+
+    raise ValueError(f"❌ INFERENCE_BACKEND tidak dikenal: {name}")
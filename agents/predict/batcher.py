@@ -0,0 +1,93 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Kumpulkan request yang datang bersamaan lalu jalankan sebagai satu batch.
+
+    `batch_fn` menerima list item dan harus mengembalikan list hasil dengan
+    urutan yang sama.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=10):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.total_batches = 0
+        self.total_items = 0
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def predict(self, item, timeout=None):
+        return self.submit(item).result(timeout=timeout)
+
+    def stats(self):
+        return {
+            "batches": self.total_batches,
+            "items": self.total_items,
+            "avg_batch_size": round(self.total_items / self.total_batches, 2) if self.total_batches else 0,
+            "queued": self._queue.qsize(),
+        }
+
+    def _collect(self):
+        # tunggu item pertama, lalu isi batch sampai penuh atau waktu tunggu habis
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            # request yang sudah dibatalkan pemanggilnya tidak perlu dihitung
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.total_batches += 1
+            self.total_items += len(batch)
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,43 @@
+import os
+from dotenv import load_dotenv
+
+# konfigurasi IndoBERT; sengaja tanpa import torch supaya bisa dibaca tanpa load model
+load_dotenv()
+
+MODEL_DIR = os.getenv("MODEL_DIR")
+if not MODEL_DIR:
+    raise ValueError("❌ MODEL_DIR tidak ditemukan di file .env")
+
+# quantization: "none" (fp32) atau "int8" (dynamic quantization layer Linear, khusus CPU)
+QUANTIZATION = os.getenv("QUANTIZATION", "none").lower()
+
+# backend: "eager" | "torchscript" | "compile" | "onnx" (lihat agents/predict/backends.py)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "eager").lower()
+
+# shared weights antar worker uvicorn: "none" atau "mmap" (state_dict di-mmap read-only -> page cache dipakai bersama)
+SHARED_WEIGHTS = os.getenv("SHARED_WEIGHTS", "none").lower()
+MMAP_WEIGHTS_PATH = os.getenv("MMAP_WEIGHTS_PATH", os.path.join(MODEL_DIR, "model.mmap.pt"))
+
+# jumlah worker (uvicorn membaca WEB_CONCURRENCY untuk --workers); thread torch dibagi rata per worker
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0"))
+
+# micro-batching: request /predict/ yang datang bersamaan digabung jadi satu forward pass
+BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "true").lower() == "true"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+
+# padding: "max_length" (selalu 512 token) atau "dynamic" (pad ke sequence terpanjang per bucket)
+MAX_LENGTH = 512
+PADDING_MODE = os.getenv("PADDING_MODE", "dynamic").lower()
+LENGTH_BUCKETS = sorted(int(b) for b in os.getenv("LENGTH_BUCKETS", "64,128,256,512").split(",") if b.strip())
+
+# long-document mode: artikel dipotong jadi window yang overlap, semua window dalam satu forward pass
+LONG_DOC_STRIDE = int(os.getenv("LONG_DOC_STRIDE", "128"))
+LONG_DOC_MAX_WINDOWS = int(os.getenv("LONG_DOC_MAX_WINDOWS", "8"))
+LONG_DOC_AGGREGATION = os.getenv("LONG_DOC_AGGREGATION", "mean").lower()
+
+# cache hasil klasifikasi: key = hash teks ternormalisasi, namespace = identitas model
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "4096"))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", ".cache/result_cache.sqlite")
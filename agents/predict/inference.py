@@ -0,0 +1,195 @@
+import os
+import torch
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+from agents.predict.backends import create_backend
+from agents.predict.config import (
+    MODEL_DIR, QUANTIZATION, INFERENCE_BACKEND, MAX_LENGTH, PADDING_MODE, LENGTH_BUCKETS, LONG_DOC_STRIDE,
+    SHARED_WEIGHTS, MMAP_WEIGHTS_PATH, WEB_CONCURRENCY, TORCH_THREADS
+)
+
+# modul berat (torch + transformers + bobot model); di-import lazy oleh agents/predict/predict.py
+
+def configure_threads():
+    # N worker x semua core = oversubscription; bagi core ke tiap worker
+    if TORCH_THREADS:
+        threads = TORCH_THREADS
+    else:
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        threads = max(1, cores // max(1, WEB_CONCURRENCY))
+    torch.set_num_threads(threads)
+    return threads
+
+def _load_mmap(**kwargs):
+    if not os.path.exists(MMAP_WEIGHTS_PATH):
+        raise FileNotFoundError(
+            f"❌ {MMAP_WEIGHTS_PATH} tidak ditemukan (jalankan: python -m scripts.export_model --format mmap)"
+        )
+
+    config = AutoConfig.from_pretrained(MODEL_DIR, **kwargs)
+    classifier = AutoModelForSequenceClassification.from_config(config)
+
+    # tensor tetap di-backing file (read-only) -> semua worker berbagi page cache yang sama
+    state_dict = torch.load(MMAP_WEIGHTS_PATH, mmap=True, weights_only=True, map_location="cpu")
+    classifier.load_state_dict(state_dict, assign=True)
+    return classifier
+
+def load_model(quantization=None, **kwargs):
+    quantization = quantization or QUANTIZATION
+
+    if SHARED_WEIGHTS == "mmap":
+        classifier = _load_mmap(**kwargs)
+    elif SHARED_WEIGHTS == "none":
+        classifier = AutoModelForSequenceClassification.from_pretrained(MODEL_DIR, **kwargs)
+    else:
+        raise ValueError(f"❌ SHARED_WEIGHTS tidak dikenal: {SHARED_WEIGHTS}")
+    classifier.eval()
+
+    if quantization == "int8" and SHARED_WEIGHTS == "mmap":
+        print("⚠️ QUANTIZATION=int8 membuat salinan bobot Linear per worker, hanya embedding yang tetap shared")
+
+    if quantization == "int8":
+        classifier = torch.ao.quantization.quantize_dynamic(
+            classifier,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+    elif quantization != "none":
+        raise ValueError(f"❌ QUANTIZATION tidak dikenal: {quantization}")
+
+    return classifier
+
+num_threads = configure_threads()
+tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
+backend = create_backend(INFERENCE_BACKEND, MODEL_DIR, load_model, QUANTIZATION)
+print(f"✅ IndoBERT backend: {backend.name} (quantization: {QUANTIZATION}, weights: {SHARED_WEIGHTS}, threads: {num_threads})")
+
+def _encode(texts, padding_mode=None):
+    # return list of (indeks item, tensor input) -> satu forward pass per grup
+    padding_mode = padding_mode or PADDING_MODE
+
+    if padding_mode != "dynamic":
+        inputs = tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            padding="max_length",
+            max_length=MAX_LENGTH
+        )
+        return [(list(range(len(texts))), inputs)]
+
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+
+    # kelompokkan berdasarkan panjang supaya teks pendek tidak ikut dipad ke teks panjang
+    buckets = {}
+    for i, input_ids in enumerate(encoded["input_ids"]):
+        bucket = next((b for b in LENGTH_BUCKETS if len(input_ids) <= b), MAX_LENGTH)
+        buckets.setdefault(bucket, []).append(i)
+
+    groups = []
+    for bucket in sorted(buckets):
+        indices = buckets[bucket]
+        features = [{key: encoded[key][i] for key in encoded.keys()} for i in indices]
+        inputs = tokenizer.pad(features, padding="longest", return_tensors="pt")
+        groups.append((indices, inputs))
+
+    return groups
+
+def _forward(inputs, runtime=None):
+    logits = (runtime or backend)(inputs)
+    return torch.nn.functional.softmax(logits.float(), dim=-1)
+
+def predict_probs(texts, padding_mode=None, runtime=None):
+    probs = [None] * len(texts)
+    for indices, inputs in _encode(texts, padding_mode):
+        group_probs = _forward(inputs, runtime)
+        for row, i in enumerate(indices):
+            probs[i] = group_probs[row]
+
+    return torch.stack(probs)
+
+def _to_result(probs):
+    pred = torch.argmax(probs, dim=-1).item()
+    label = "valid" if pred == 1 else "hoaks"
+    confidence = round(probs[pred].item() * 100, 2)
+    return {"label": label, "confidence": confidence}
+
+def _pool(hidden, attention_mask):
+    # mean pooling hidden state terakhir (tanpa padding), dinormalisasi -> dot product = cosine
+    mask = attention_mask.unsqueeze(-1).float()
+    pooled = (hidden.float() * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1.0)
+    return torch.nn.functional.normalize(pooled, dim=-1)
+
+def classify_batch(items, with_embeddings=False):
+    # items: list of (title, content)
+    # with_embeddings: -> list of (hasil, embedding) dari forward pass yang sama
+    # (embedding None kalau backend hanya mengeluarkan logits)
+    texts = [f"{title}\n\n{content}" for title, content in items]
+    if not with_embeddings:
+        return [_to_result(p) for p in predict_probs(texts)]
+
+    results = [None] * len(texts)
+    for indices, inputs in _encode(texts):
+        logits, hidden = backend.with_hidden(inputs)
+        probs = torch.nn.functional.softmax(logits.float(), dim=-1)
+        pooled = _pool(hidden, inputs["attention_mask"]) if hidden is not None else None
+        for row, i in enumerate(indices):
+            results[i] = (_to_result(probs[row]), pooled[row].numpy() if pooled is not None else None)
+
+    return results
+
+def _split_windows(text, max_windows):
+    input_ids = tokenizer(text, add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+    window_size = MAX_LENGTH - tokenizer.num_special_tokens_to_add()
+    step = max(1, window_size - LONG_DOC_STRIDE)
+
+    starts = list(range(0, max(len(input_ids) - LONG_DOC_STRIDE, 1), step))
+
+    # kalau window terlalu banyak, ambil yang tersebar merata (awal dan akhir artikel selalu ikut)
+    if len(starts) > max_windows:
+        if max_windows == 1:
+            starts = starts[:1]
+        else:
+            last = len(starts) - 1
+            starts = [starts[round(i * last / (max_windows - 1))] for i in range(max_windows)]
+
+    return [input_ids[start:start + window_size] for start in starts]
+
+def _aggregate(probs, aggregation):
+    if aggregation == "max":
+        # pakai window yang paling yakin
+        return probs[probs.max(dim=-1).values.argmax()]
+    if aggregation == "attention":
+        # window dengan prediksi lebih yakin dapat bobot lebih besar
+        weights = torch.softmax(probs.max(dim=-1).values / 0.1, dim=0)
+        return (weights.unsqueeze(-1) * probs).sum(dim=0)
+    return probs.mean(dim=0)
+
+def classify_long(title, content, aggregation, max_windows, with_embedding=False):
+    windows = _split_windows(f"{title}\n\n{content}", max_windows)
+
+    features = []
+    for window in windows:
+        feature = {
+            "input_ids": tokenizer.build_inputs_with_special_tokens(window),
+            "token_type_ids": tokenizer.create_token_type_ids_from_sequences(window),
+        }
+        feature["attention_mask"] = [1] * len(feature["input_ids"])
+        features.append(feature)
+
+    inputs = tokenizer.pad(features, padding="longest", return_tensors="pt")
+    if "token_type_ids" not in tokenizer.model_input_names:
+        inputs.pop("token_type_ids", None)
+
+    logits, hidden = backend.with_hidden(inputs) if with_embedding else (backend(inputs), None)
+    probs = torch.nn.functional.softmax(logits.float(), dim=-1)
+
+    result = _to_result(_aggregate(probs, aggregation))
+    result["windows"] = len(windows)
+    if not with_embedding:
+        return result
+
+    # embedding artikel utuh = rata-rata embedding semua window
+    embedding = None
+    if hidden is not None:
+        embedding = torch.nn.functional.normalize(_pool(hidden, inputs["attention_mask"]).mean(dim=0), dim=-1).numpy()
+    return result, embedding
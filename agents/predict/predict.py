@@ -1,43 +1,151 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import os
-from dotenv import load_dotenv
-from llm.gpt_runtime import GPTRunTime
 import re
 import json
-load_dotenv()
-
-MODEL_DIR = os.getenv("MODEL_DIR")
-if not MODEL_DIR:
-    raise ValueError("❌ MODEL_DIR tidak ditemukan di file .env")
-
-tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_DIR)
+import hashlib
+import threading
+from clients.llm_clients import get_gpt_runtime
+from llm.prompt_builder import build_prompt, compact_json, Text, Items, Evidence, PROMPT_TITLE_MAX_TOKENS
+from agents.predict.batcher import MicroBatcher
+from agents.predict.config import (
+    MODEL_DIR, QUANTIZATION, INFERENCE_BACKEND, PADDING_MODE,
+    BATCHING_ENABLED, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS,
+    LONG_DOC_STRIDE, LONG_DOC_MAX_WINDOWS, LONG_DOC_AGGREGATION,
+    RESULT_CACHE_ENABLED, RESULT_CACHE_SIZE, RESULT_CACHE_PATH
+)
+from cache.tiered_cache import TieredCache
+
+# torch/transformers dan bobot model baru di-load saat pertama dipakai (atau saat warm-up)
+_load_lock = threading.Lock()
+_inference = None
+
+def get_inference():
+    global _inference
+    if _inference is None:
+        with _load_lock:
+            if _inference is None:
+                from agents.predict import inference
+                _inference = inference
+    return _inference
+
+def is_model_loaded():
+    return _inference is not None
+
+def warmup():
+    get_inference().classify_batch([("warm up", "warm up")])
+
+def _classify_batch(items):
+    # items: list of (title, content, with_embedding) -> list of (hasil, embedding atau None).
+    # embedding (agents/similar) hanya diminta pipeline evidence; batch tanpa permintaan itu
+    # cukup mengeluarkan logits
+    pairs = [(title, content) for title, content, _ in items]
+    if not any(with_embedding for _, _, with_embedding in items):
+        return [(result, None) for result in get_inference().classify_batch(pairs)]
+    results = get_inference().classify_batch(pairs, with_embeddings=True)
+    return [(result, embedding if item[2] else None) for item, (result, embedding) in zip(items, results)]
+
+batcher = MicroBatcher(
+    _classify_batch,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS
+)
+
+def _model_identity():
+    # berubah kalau file checkpoint / quantization / backend / padding berubah -> cache lama otomatis
+    # tidak valid (backend & padding bisa menggeser logit sedikit)
+    digest = hashlib.sha256(f"{MODEL_DIR}|{QUANTIZATION}|{INFERENCE_BACKEND}|{PADDING_MODE}".encode("utf-8"))
+    if os.path.isdir(MODEL_DIR):
+        for name in sorted(os.listdir(MODEL_DIR)):
+            path = os.path.join(MODEL_DIR, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def _lowercase_input():
+    # baca dari tokenizer_config.json supaya key cache bisa dihitung tanpa load tokenizer
+    path = os.path.join(MODEL_DIR, "tokenizer_config.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return bool(json.load(f).get("do_lower_case", False))
+    except (OSError, ValueError):
+        return False
+
+LOWERCASE_INPUT = _lowercase_input()
+MODEL_IDENTITY = _model_identity()
+
+result_cache = TieredCache(
+    max_items=RESULT_CACHE_SIZE,
+    disk_path=RESULT_CACHE_PATH or None,
+    namespace=MODEL_IDENTITY
+) if RESULT_CACHE_ENABLED else None
+
+def cache_key(title, content, mode="default"):
+    text = " ".join(f"{title}\n\n{content}".split())
+    if LOWERCASE_INPUT:
+        text = text.lower()
+    return hashlib.sha256(f"{mode}\x00{text}".encode("utf-8")).hexdigest()
+
+def _cached(key, compute):
+    if result_cache is None:
+        return compute()
+
+    result = result_cache.get(key)
+    if result is None:
+        result = compute()
+        result_cache.set(key, result)
+    return result
+
+def _classify_one(title, content, with_embedding=False):
+    # -> (hasil, embedding atau None)
+    if not BATCHING_ENABLED:
+        return _classify_batch([(title, content, with_embedding)])[0]
+    return batcher.predict((title, content, with_embedding))
 
 def classify_berita(title, content):
-    text = f"{title}\n\n{content}"
-
-    inputs = tokenizer(
-        text,
-        return_tensors="pt",
-        truncation=True,   
-        padding="max_length", 
-        max_length=512      
-    )
-
-    with torch.no_grad():
-        outputs = model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
-        pred = torch.argmax(probs, dim=-1).item()
-
-    label = "valid" if pred == 1 else "hoaks"
-    confidence = round(probs[0][pred].item() * 100, 2)
-
-    # return {"label": label, "confidence": confidence, "probs": probs.tolist()}
-    return {"label": label, "confidence": confidence}
+    return _cached(cache_key(title, content), lambda: _classify_one(title, content)[0])
+
+def classify_berita_with_embedding(title, content):
+    # embedding dibutuhkan -> forward pass tetap jalan (sekali), hasilnya sekalian mengisi cache
+    result, embedding = _classify_one(title, content, with_embedding=True)
+    if result_cache is not None:
+        result_cache.set(cache_key(title, content), result)
+    return result, embedding
+
+def classify_many(items):
+    # items: list of (title, content); tetap lewat batcher supaya forward pass tidak rebutan thread
+    keys = [cache_key(title, content) for title, content in items]
+    results = [result_cache.get(key) if result_cache else None for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        pending = [items[i] for i in missing]
+        if BATCHING_ENABLED:
+            futures = [batcher.submit((title, content, False)) for title, content in pending]
+            computed = [future.result()[0] for future in futures]
+        else:
+            computed = get_inference().classify_batch(pending)
+
+        for i, result in zip(missing, computed):
+            results[i] = result
+            if result_cache:
+                result_cache.set(keys[i], result)
+
+    return results
+
+def _long_key(title, content, aggregation, max_windows):
+    return cache_key(title, content, mode=f"long:{aggregation}:{max_windows}:{LONG_DOC_STRIDE}")
+
+def classify_berita_long_with_embedding(title, content):
+    # embedding = rata-rata semua window, dari forward pass klasifikasi yang sama
+    aggregation = LONG_DOC_AGGREGATION
+    max_windows = max(1, LONG_DOC_MAX_WINDOWS)
+    result, embedding = get_inference().classify_long(title, content, aggregation, max_windows, with_embedding=True)
+    if result_cache is not None:
+        result_cache.set(_long_key(title, content, aggregation, max_windows), result)
+    return result, embedding
 
 def advance_classify_berita(classification, news_scrape, title, evidence_link, content):
-    gpt_runtime = GPTRunTime()
+    gpt_runtime = get_gpt_runtime()
 
     system_prompt = """Kamu adalah asisten AI yang menilai apakah suatu berita tergolong hoaks atau valid.
 Gunakan hasil klasifikasi IndoBERT dan hasil scraping berita dari internet sebagai referensi.
@@ -48,24 +156,34 @@ contoh output:
 {"final_label": "hoaks", "final_confidence": 85.5}
 """
 
-    user_prompt = f"""
+    # konten input, evidence & link dipotong sampai muat budget token stage ini
+    user_prompt = build_prompt(
+        "advance_classification",
+        lambda title, content, links, evidence: f"""
 Berikut adalah berita yang ingin diklasifikasikan:
 
 Judul: {title}
 content: {content}
 
 Hasil klasifikasi IndoBERT:
-{json.dumps(classification, ensure_ascii=False, indent=2)}
+{compact_json(classification)}
 (kadang hasil klasifikasi bisa salah, jadi tentukan berdasarkan bukti yang ada)
 
 Link bukti yang ditemukan:
-{json.dumps(evidence_link, ensure_ascii=False, indent=2)}
+{links}
 
 Hasil scraping berita referensi:
-{json.dumps(news_scrape, ensure_ascii=False, indent=2)}
+{evidence}
 
 Tentukan apakah berita ini hoaks atau valid berdasarkan konteks dan kesesuaian dengan berita referensi.
-"""
+""",
+        system_prompt=system_prompt,
+        # judul ikut dihitung (prioritas tinggi, dibatasi) supaya judul panjang tidak menghabiskan budget evidence
+        title=Text(title, weight=4.0, max_tokens=PROMPT_TITLE_MAX_TOKENS),
+        content=Text(content, weight=1.0),
+        links=Items(evidence_link, weight=0.5),
+        evidence=Evidence(news_scrape, weight=2.0),
+    )
 
     # response = groq_runtime.generate_response(system_prompt, user_prompt)
     raw = gpt_runtime.generate_response(system_prompt, user_prompt)
@@ -0,0 +1,291 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+
+# index vektor embedding berita: matriks float16 / int8 di file yang di-memory-map (bisa dibaca
+# bersama oleh semua worker lewat page cache), metadata + payload di SQLite.
+# pencarian: brute-force (matmul per chunk) atau IVF (k-means, hanya cluster terdekat yang di-scan)
+SEARCH_CHUNK_ROWS = 4096
+INITIAL_CAPACITY = 1024
+
+
+def _dot(block, query):
+    # konversi float16 -> float32 di numpy lambat (tanpa SIMD); torch sudah ter-load untuk
+    # IndoBERT jadi dipakai kalau ada
+    try:
+        import torch
+    except ImportError:
+        return np.asarray(block, dtype=np.float32) @ query
+    return (torch.from_numpy(np.ascontiguousarray(block)).float() @ torch.from_numpy(query)).numpy()
+
+
+class EmbeddingIndex:
+    def __init__(self, directory, dim, dtype="float16", namespace="", ann="flat",
+                 ivf_min_rows=20000, ivf_nprobe=8):
+        if dtype not in ("float16", "int8"):
+            raise ValueError(f"❌ EMBEDDING_DTYPE tidak dikenal: {dtype}")
+        if ann not in ("flat", "ivf"):
+            raise ValueError(f"❌ EMBEDDING_ANN tidak dikenal: {ann}")
+
+        self.directory = directory
+        self.dim = dim
+        self.dtype = dtype
+        self.namespace = namespace
+        self.ann = ann
+        self.ivf_min_rows = ivf_min_rows
+        self.ivf_nprobe = ivf_nprobe
+
+        self._lock = threading.RLock()
+        self._vectors = None
+        self._scales = None
+        self._capacity = 0
+
+        # IVF: centroid [nlist, dim] + daftar baris per cluster
+        self._centroids = None
+        self._lists = None
+        self._indexed_rows = 0
+        self._trained_rows = 0
+        self._training = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, "meta.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "row INTEGER PRIMARY KEY, key TEXT UNIQUE, payload TEXT, created_at REAL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+        self._check_layout()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _check_layout(self):
+        # model / dimensi / dtype berubah -> vektor lama tidak bisa dibandingkan, mulai dari kosong
+        layout = f"{self.namespace}|{self.dim}|{self.dtype}"
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'layout'").fetchone()
+        if row and row[0] == layout:
+            return
+        if row:
+            print(f"♻️ embedding index direset (layout berubah: {row[0]} → {layout})")
+        self._db.execute("DELETE FROM items")
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('layout', ?)", (layout,))
+        self._db.commit()
+        for name in ("vectors.bin", "scales.bin", "ivf.npz"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+    def __len__(self):
+        # sumber kebenaran jumlah baris = SQLite (worker lain bisa menambah baris)
+        row = self._db.execute("SELECT MAX(row) FROM items").fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _map(self, rows):
+        # (re)map file vektor; diperbesar 2x kalau kapasitas kurang
+        if self._vectors is not None and rows <= self._capacity:
+            return
+        itemsize = 2 if self.dtype == "float16" else 1
+        path = self._path("vectors.bin")
+        current = os.path.getsize(path) // (self.dim * itemsize) if os.path.exists(path) else 0
+
+        capacity = max(current, INITIAL_CAPACITY)
+        while capacity < rows:
+            capacity *= 2
+        if capacity > current:
+            with open(path, "ab") as f:
+                f.truncate(capacity * self.dim * itemsize)
+
+        self._vectors = np.memmap(path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+        if self.dtype == "int8":
+            scales_path = self._path("scales.bin")
+            with open(scales_path, "ab") as f:
+                f.truncate(capacity * 4)
+            self._scales = np.memmap(scales_path, dtype=np.float32, mode="r+", shape=(capacity,))
+        self._capacity = capacity
+
+    def _store(self, row, vector):
+        if self.dtype == "float16":
+            self._vectors[row] = vector.astype(np.float16)
+        else:
+            # int8 simetris per vektor: nilai = int8 * scale
+            scale = max(float(np.abs(vector).max()) / 127.0, 1e-12)
+            self._vectors[row] = np.clip(np.round(vector / scale), -127, 127).astype(np.int8)
+            self._scales[row] = scale
+
+    def _rows_as_float(self, start, end):
+        block = np.asarray(self._vectors[start:end], dtype=np.float32)
+        if self.dtype == "int8":
+            block *= self._scales[start:end, None]
+        return block
+
+    def _scores(self, start, end, query):
+        # int8: scale dikalikan setelah dot product (lebih murah daripada men-dequantize blok)
+        scores = _dot(self._vectors[start:end], query)
+        if self.dtype == "int8":
+            scores *= self._scales[start:end]
+        return scores
+
+    def add(self, key, vector, payload):
+        # key sama (teks identik) -> payload diperbarui, vektor tidak ditulis ulang
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        with self._lock:
+            existing = self._db.execute("SELECT row FROM items WHERE key = ?", (key,)).fetchone()
+            if existing:
+                self._db.execute(
+                    "UPDATE items SET payload = ?, created_at = ? WHERE row = ?",
+                    (json.dumps(payload, ensure_ascii=False), time.time(), existing[0])
+                )
+                self._db.commit()
+                return existing[0]
+
+            # BEGIN IMMEDIATE: worker lain tidak bisa mengambil nomor baris yang sama
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = len(self)
+                self._map(row + 1)
+                self._store(row, vector)
+                self._vectors.flush()
+                if self._scales is not None:
+                    self._scales.flush()
+                # baris baru baru "terlihat" setelah vektornya tertulis
+                self._db.execute(
+                    "INSERT INTO items (row, key, payload, created_at) VALUES (?, ?, ?, ?)",
+                    (row, key, json.dumps(payload, ensure_ascii=False), time.time())
+                )
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+
+        self._maybe_train(row + 1)
+        return row
+
+    def search(self, vector, k=1):
+        # -> [(row, cosine)] urut menurun
+        query = np.asarray(vector, dtype=np.float32).reshape(-1)
+        with self._lock:
+            rows = len(self)
+            if rows == 0:
+                return []
+            self._map(rows)
+
+            if self._lists is not None:
+                scores, candidates = self._search_ivf(query, rows)
+            else:
+                scores = np.concatenate([
+                    self._scores(start, min(start + SEARCH_CHUNK_ROWS, rows), query)
+                    for start in range(0, rows, SEARCH_CHUNK_ROWS)
+                ])
+                candidates = None
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        found = candidates[top] if candidates is not None else top
+        return [(int(row), float(score)) for row, score in zip(found, scores[top])]
+
+    def _assign(self, start, end, centroids):
+        return np.concatenate([
+            np.argmax(self._rows_as_float(s, min(s + SEARCH_CHUNK_ROWS, end)) @ centroids.T, axis=1)
+            for s in range(start, end, SEARCH_CHUNK_ROWS)
+        ])
+
+    def _search_ivf(self, query, rows):
+        # baris baru (dari worker ini atau worker lain) di-assign ke cluster terdekat dulu
+        if rows > self._indexed_rows:
+            for offset, cluster in enumerate(self._assign(self._indexed_rows, rows, self._centroids)):
+                self._lists[cluster] = np.append(self._lists[cluster], self._indexed_rows + offset)
+            self._indexed_rows = rows
+
+        nearest = np.argsort(-(self._centroids @ query))[:self.ivf_nprobe]
+        candidates = np.sort(np.concatenate([self._lists[c] for c in nearest])).astype(np.int64)
+        scores = _dot(self._vectors[candidates], query)
+        if self.dtype == "int8":
+            scores *= self._scales[candidates]
+        return scores, candidates
+
+    def payload(self, row):
+        result = self._db.execute("SELECT payload FROM items WHERE row = ?", (row,)).fetchone()
+        return json.loads(result[0]) if result else None
+
+    def _maybe_train(self, rows):
+        # IVF dilatih ulang di background setiap jumlah baris 2x lipat dari training terakhir
+        if self.ann != "ivf" or rows < self.ivf_min_rows or self._training:
+            return
+        if self._trained_rows and rows < 2 * self._trained_rows:
+            return
+        self._training = True
+        threading.Thread(target=self._train, args=(rows,), name="embedding-ivf", daemon=True).start()
+
+    def _train(self, rows, iterations=10, seed=0):
+        try:
+            start = time.perf_counter()
+            nlist = max(1, int(np.sqrt(rows)))
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(rows, size=min(rows, nlist * 64), replace=False))
+            with self._lock:
+                sample = np.asarray(self._vectors[sample_rows], dtype=np.float32)
+                if self.dtype == "int8":
+                    sample *= self._scales[sample_rows][:, None]
+
+            # spherical k-means (vektor ternormalisasi -> assignment pakai dot product)
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(nlist):
+                    members = sample[assignment == c]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+            assignment = self._assign(0, rows, centroids)
+            lists = [np.flatnonzero(assignment == c) for c in range(nlist)]
+            np.savez(self._path("ivf.npz"), centroids=centroids, rows=np.array(rows))
+
+            # baris yang masuk selama training di-assign saat search berikutnya
+            with self._lock:
+                self._centroids = centroids
+                self._lists = lists
+                self._indexed_rows = rows
+                self._trained_rows = rows
+            print(f"🧭 IVF embedding index: {rows} baris, {nlist} cluster ({time.perf_counter() - start:.1f} s)")
+        except Exception as e:
+            print(f"⚠️ Gagal training IVF embedding index: {e}")
+        finally:
+            self._training = False
+
+    def load(self):
+        # map file + pakai centroid IVF tersimpan kalau ada (assignment dihitung ulang dari vektor)
+        rows = len(self)
+        if rows == 0:
+            return
+        with self._lock:
+            self._map(rows)
+        if self.ann == "ivf":
+            path = self._path("ivf.npz")
+            if os.path.exists(path):
+                saved = np.load(path)
+                centroids = saved["centroids"]
+                assignment = self._assign(0, rows, centroids)
+                with self._lock:
+                    self._centroids = centroids
+                    self._lists = [np.flatnonzero(assignment == c) for c in range(len(centroids))]
+                    self._indexed_rows = rows
+                    self._trained_rows = int(saved["rows"])
+            self._maybe_train(rows)
+
+    def stats(self):
+        return {
+            "rows": len(self),
+            "dim": self.dim,
+            "dtype": self.dtype,
+            "ann": "ivf" if self._lists is not None else "flat",
+            "ivf_clusters": len(self._lists) if self._lists is not None else 0,
+            "bytes": self._capacity * self.dim * (2 if self.dtype == "float16" else 1),
+        }
@@ -0,0 +1,156 @@
+import os
+import re
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from agents.predict.config import MODEL_DIR
+from agents.predict.predict import cache_key, MODEL_IDENTITY
+
+# banyak kiriman adalah parafrase hoaks yang sudah pernah dicek: embedding IndoBERT berita baru
+# dibandingkan dengan berita yang sudah diverifikasi.
+# - cosine >= SIMILAR_THRESHOLD: evidence (hasil scrape) berita lama dipakai, scrape dilewati,
+#   verdict tetap dihitung ulang oleh LLM
+# - verdict + explanation lama dipakai langsung (LLM dilewati) hanya kalau juga lolos cek ketat:
+#   cosine >= SIMILAR_REUSE_THRESHOLD, label IndoBERT sama, kata (stem) hampir sama, angka sama
+#   persis dan jumlah kata negasi sama -- parafrase hoaks biasanya beda satu fakta / angka / negasi
+# embedding diambil dari forward pass klasifikasi (hidden state terakhir), bukan forward terpisah
+SIMILAR_ENABLED = os.getenv("SIMILAR_ENABLED", "true").lower() == "true"
+SIMILAR_THRESHOLD = float(os.getenv("SIMILAR_THRESHOLD", "0.97"))
+SIMILAR_REUSE_ENABLED = os.getenv("SIMILAR_REUSE_ENABLED", "true").lower() == "true"
+SIMILAR_REUSE_THRESHOLD = float(os.getenv("SIMILAR_REUSE_THRESHOLD", "0.985"))
+SIMILAR_REUSE_MIN_OVERLAP = float(os.getenv("SIMILAR_REUSE_MIN_OVERLAP", "0.9"))
+EMBEDDING_INDEX_DIR = os.getenv("EMBEDDING_INDEX_DIR", ".cache/embeddings")
+# "float16" (2 byte/dimensi) atau "int8" (1 byte/dimensi + 1 scale per vektor)
+EMBEDDING_DTYPE = os.getenv("EMBEDDING_DTYPE", "float16").lower()
+# "flat" (brute-force) atau "ivf" (aktif setelah IVF_MIN_ROWS baris, sebelum itu tetap brute-force)
+EMBEDDING_ANN = os.getenv("EMBEDDING_ANN", "flat").lower()
+IVF_MIN_ROWS = int(os.getenv("IVF_MIN_ROWS", "20000"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+
+NEGATIONS = frozenset({"tidak", "tak", "bukan", "belum", "tanpa", "jangan", "enggak", "nggak", "gak", "tiada"})
+
+_index_lock = threading.Lock()
+_index = None
+# tulis index di background, tidak menambah latency response
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-index")
+
+
+def _hidden_size():
+    with open(os.path.join(MODEL_DIR, "config.json"), encoding="utf-8") as f:
+        return json.load(f)["hidden_size"]
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from agents.similar.embedding_index import EmbeddingIndex
+                index = EmbeddingIndex(
+                    EMBEDDING_INDEX_DIR,
+                    dim=_hidden_size(),
+                    dtype=EMBEDDING_DTYPE,
+                    namespace=MODEL_IDENTITY,
+                    ann=EMBEDDING_ANN,
+                    ivf_min_rows=IVF_MIN_ROWS,
+                    ivf_nprobe=IVF_NPROBE,
+                )
+                index.load()
+                _index = index
+    return _index
+
+
+def signature(title, content):
+    # ringkasan leksikal untuk cek verdict reuse: stem (tanpa stopword), angka, jumlah negasi
+    from agents.get_evidence.passage_ranker import tokenize
+
+    text = f"{title}\n{content}".lower()
+    return {
+        "terms": sorted(set(tokenize(text))),
+        "numbers": sorted(set(re.findall(r"\d+(?:[.,]\d+)*", text))),
+        "negations": sum(word in NEGATIONS for word in re.findall(r"[a-z]+", text)),
+    }
+
+
+def _reusable(payload, similarity, title, content, label):
+    stored = payload.get("signature")
+    if not SIMILAR_REUSE_ENABLED or not stored or not payload.get("classification"):
+        return False
+    if similarity < SIMILAR_REUSE_THRESHOLD or label is None or label != payload.get("indobert_label"):
+        return False
+
+    current = signature(title, content)
+    if current["numbers"] != stored["numbers"] or current["negations"] != stored["negations"]:
+        return False
+    terms, stored_terms = set(current["terms"]), set(stored["terms"])
+    union = terms | stored_terms
+    return bool(union) and len(terms & stored_terms) / len(union) >= SIMILAR_REUSE_MIN_OVERLAP
+
+
+def find_similar(vector, title="", content="", label=None):
+    # -> {"payload", "similarity", "reuse"} kalau ada berita terverifikasi yang cukup mirip, else None
+    # reuse=True: verdict + explanation berita lama boleh dipakai langsung
+    if not SIMILAR_ENABLED or vector is None:
+        return None
+    try:
+        hits = get_index().search(vector, k=1)
+        if not hits or hits[0][1] < SIMILAR_THRESHOLD:
+            return None
+        row, similarity = hits[0]
+        payload = get_index().payload(row)
+    except Exception as e:
+        print(f"⚠️ Gagal cari berita serupa: {e}")
+        return None
+
+    if not payload or not payload.get("evidence_scraped"):
+        return None
+    reuse = _reusable(payload, similarity, title, content, label)
+    action = "verdict + evidence" if reuse else "evidence"
+    print(f"♻️ {action} berita serupa dipakai (cosine {similarity:.3f}): {payload.get('title', '')[:60]}")
+    return {"payload": payload, "similarity": round(similarity, 4), "reuse": reuse}
+
+
+def remember(title, content, response, vector, label=None):
+    # simpan evidence hasil search + scrape server sendiri; hanya kalau stage evidence tidak
+    # di-fallback dan evidence-nya bukan pinjaman dari berita serupa lain.
+    # verdict ikut disimpan hanya kalau tidak ada stage yang di-fallback (LLM benar-benar jalan)
+    if not SIMILAR_ENABLED or vector is None or not response:
+        return
+    if response.get("similar_to") or response.get("reused_from") or not response.get("evidence_scraped"):
+        return
+    skipped = set(response.get("skipped_stages") or {})
+    if skipped & {"local", "links", "scraped"}:
+        return
+
+    payload = {
+        "url": response.get("url", ""),
+        "title": title,
+        "evidence_links": response.get("evidence_links") or [],
+        "evidence_scraped": response["evidence_scraped"],
+    }
+    if not skipped and label is not None and response.get("classification") and response.get("explanation"):
+        payload.update({
+            "classification": response["classification"],
+            "explanation": response["explanation"],
+            "indobert_label": label,
+            "signature": signature(title, content),
+        })
+
+    def write():
+        try:
+            get_index().add(cache_key(title, content), vector, payload)
+        except Exception as e:
+            print(f"⚠️ Gagal simpan embedding berita: {e}")
+
+    _writer.submit(write)
+
+
+def stats():
+    if not SIMILAR_ENABLED:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "threshold": SIMILAR_THRESHOLD,
+        "reuse_threshold": SIMILAR_REUSE_THRESHOLD if SIMILAR_REUSE_ENABLED else None,
+        **get_index().stats(),
+    }
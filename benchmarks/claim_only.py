@@ -0,0 +1,15 @@
+import csv
+
+DATASET_DIR = "model/datasets/claim_only"
+
+
+def load_split(split, limit=None):
+    # return (texts, labels) dengan format teks yang sama seperti classify_berita
+    with open(f"{DATASET_DIR}/{split}.csv", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    if limit:
+        rows = rows[:limit]
+
+    texts = [f"{row['Headline']}\n\n{row['text']}" for row in rows]
+    labels = [int(row["label"]) for row in rows]
+    return texts, labels
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from textwrap import dedent
+
+from agents.get_evidence.html_extract import extract_fields_soup, extract_fields_lxml
+
+# python -m benchmarks.html_extraction --runs 20
+# bandingkan engine ekstraksi lama (BeautifulSoup html.parser) dengan lxml di fixture HTML
+# situs berita, sekaligus tampilkan field yang berbeda antar engine.
+# fixture bawaan adalah HTML sintetis yang meniru struktur situs berita, URL-nya sengaja host
+# *.example supaya tidak terbaca sebagai hasil capture (malformed_*.html: markup rusak yang memang
+# di-parse berbeda, lihat agents/get_evidence/html_extract.py).
+# ganti / tambah dengan halaman asli (URL asal ikut tercatat di urls.json):
+# python -m benchmarks.html_extraction --save <url> <nama.html>
+# --strict: exit 1 kalau ada field yang berbeda (malformed_* dilewati)
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+MANIFEST = os.path.join(FIXTURE_DIR, "urls.json")
+
+
+def load_fixtures():
+    with open(MANIFEST, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    fixtures = []
+    for name, url in sorted(manifest.items()):
+        with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+            fixtures.append((name, url, f.read()))
+    return fixtures
+
+
+def save_fixture(url, name):
+    from agents.get_evidence.scrape_html import DIRECT_HEADERS
+    from clients.http_clients import get_http_client
+
+    response = get_http_client().get(url, headers=DIRECT_HEADERS, timeout=30)
+    response.raise_for_status()
+    with open(os.path.join(FIXTURE_DIR, name), "w", encoding="utf-8") as f:
+        f.write(response.text)
+
+    with open(MANIFEST, encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest[name] = url
+    with open(MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"✅ {name} disimpan ({len(response.text) / 1024:.1f} KB)")
+
+
+def timed(extract, html, url, runs):
+    latencies = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        extract(html, url)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(latencies)
+
+
+def diff_fields(expected, actual):
+    return [key for key in expected if expected[key] != actual[key]]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='HTML Extraction Benchmark')
+    parser.add_argument('-r', '--runs', type=int, default=20, help='Runs per page and engine')
+    parser.add_argument('--save', nargs=2, metavar=('URL', 'NAME'), help='Download a page into the fixture set')
+    parser.add_argument('--strict', action='store_true', help='Exit non-zero if any non-malformed page differs')
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixture(*args.save)
+        sys.exit(0)
+
+    fixtures = load_fixtures()
+
+    rows = []
+    mismatches = 0
+    soup_total = 0
+    lxml_total = 0
+    for name, url, html in fixtures:
+        diff = diff_fields(extract_fields_soup(html, url), extract_fields_lxml(html, url))
+        if diff and not name.startswith("malformed_"):
+            mismatches += 1
+
+        soup_ms = timed(extract_fields_soup, html, url, args.runs)
+        lxml_ms = timed(extract_fields_lxml, html, url, args.runs)
+        soup_total += soup_ms
+        lxml_total += lxml_ms
+        rows.append((name, len(html) / 1024, soup_ms, lxml_ms, "differs: " + ", ".join(diff) if diff else "same"))
+
+    print(dedent(f'''
+    ---------------------------------------------------------------------------
+     HTML Extraction ({len(fixtures)} pages, median of {args.runs} runs)
+    ---------------------------------------------------------------------------
+     Page                 |     KB | html.parser ms |  lxml ms | Speedup | Parity
+    ---------------------------------------------------------------------------'''))
+    for name, kb, soup_ms, lxml_ms, parity in rows:
+        print(f" {name:<20} | {kb:>6.1f} | {soup_ms:>14.2f} | {lxml_ms:>8.2f} | {soup_ms / lxml_ms:>6.1f}x | {parity}")
+    print("---------------------------------------------------------------------------")
+    print(f" {'Total':<20} | {'':>6} | {soup_total:>14.2f} | {lxml_total:>8.2f} | {soup_total / lxml_total:>6.1f}x |")
+    print(f" Unexpected differences (excluding malformed_*): {mismatches}/{len(fixtures)}")
+    print("---------------------------------------------------------------------------")
+
+    sys.exit(1 if args.strict and mismatches else 0)
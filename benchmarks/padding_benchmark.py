@@ -0,0 +1,61 @@
+import argparse
+import statistics
+import time
+from textwrap import dedent
+
+# python -m benchmarks.padding_benchmark --split test --batch_sizes 1 8 16
+# (MODEL_DIR harus sudah ada di .env)
+from agents.predict.inference import predict_probs
+from benchmarks.claim_only import load_split
+
+
+def run(texts, batch_size, padding_mode):
+    latencies = []
+    preds = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        t0 = time.perf_counter()
+        probs = predict_probs(batch, padding_mode=padding_mode)
+        elapsed = time.perf_counter() - t0
+        latencies.append(elapsed * 1000 / len(batch))
+        preds.extend(probs.argmax(dim=-1).tolist())
+    return latencies, preds
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Padding Benchmark')
+    parser.add_argument('-s', '--split', choices=['train', 'validation', 'test'], default='test', help='Dataset split')
+    parser.add_argument('-n', '--limit', type=int, default=None, help='Maximum number of texts')
+    parser.add_argument('-b', '--batch_sizes', type=int, nargs='+', default=[1, 8, 16], help='Batch sizes to measure')
+    args = parser.parse_args()
+
+    texts, _ = load_split(args.split, args.limit)
+
+    # warm-up supaya alokasi pertama tidak ikut terukur
+    predict_probs(texts[:2], padding_mode="max_length")
+    predict_probs(texts[:2], padding_mode="dynamic")
+
+    print(dedent(f'''
+    -----------------------------------------------------------------------
+     Padding Benchmark ({args.split}, {len(texts)} texts)
+    -----------------------------------------------------------------------
+     Batch | Mode        | mean ms/item | p50 ms/item | p95 ms/item | agree
+    -----------------------------------------------------------------------'''))
+
+    for batch_size in args.batch_sizes:
+        fixed_lat, fixed_preds = run(texts, batch_size, "max_length")
+        dynamic_lat, dynamic_preds = run(texts, batch_size, "dynamic")
+        agreement = sum(a == b for a, b in zip(fixed_preds, dynamic_preds)) / len(texts) * 100
+
+        for mode, lat in [("max_length", fixed_lat), ("dynamic", dynamic_lat)]:
+            print(f"     {batch_size:<5} | {mode:<11} | {statistics.mean(lat):>12.2f} | "
+                  f"{percentile(lat, 0.5):>11.2f} | {percentile(lat, 0.95):>11.2f} | {agreement:.1f}%")
+
+        speedup = statistics.mean(fixed_lat) / statistics.mean(dynamic_lat)
+        print(f"     {batch_size:<5} | speedup     | {speedup:>11.2f}x |")
+    print("    -----------------------------------------------------------------------")
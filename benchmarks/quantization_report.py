@@ -0,0 +1,124 @@
+import argparse
+import io
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from textwrap import dedent
+
+# python -m benchmarks.quantization_report --split test
+# bandingkan model fp32 vs dynamic int8: akurasi, kesepakatan label, latency, memori
+
+
+def max_rss_mb():
+    # linux: ru_maxrss dalam KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def memory_probe(split):
+    # dijalankan di proses terpisah supaya RSS tiap mode tidak tercampur
+    from agents.predict.inference import predict_probs
+    from benchmarks.claim_only import load_split
+
+    texts, _ = load_split(split, limit=16)
+    predict_probs(texts)
+    print(f"{max_rss_mb():.1f}")
+
+
+def measure_rss(quantization, split):
+    env = dict(os.environ, QUANTIZATION=quantization, BATCHING_ENABLED="false")
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.quantization_report", "--memory_probe", "--split", split],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def state_dict_mb(classifier):
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(classifier.state_dict(), buffer)
+    return buffer.tell() / 1024 / 1024
+
+
+def evaluate(classifier, texts, batch_size):
+    from agents.predict.inference import predict_probs
+    from agents.predict.backends import EagerBackend
+
+    runtime = EagerBackend(classifier)
+
+    latencies = []
+    probs = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        t0 = time.perf_counter()
+        probs.append(predict_probs(batch, runtime=runtime))
+        latencies.append((time.perf_counter() - t0) * 1000 / len(batch))
+    return latencies, probs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='INT8 Quantization Parity Report')
+    parser.add_argument('-s', '--split', choices=['train', 'validation', 'test'], default='test', help='Dataset split')
+    parser.add_argument('-n', '--limit', type=int, default=None, help='Maximum number of texts')
+    parser.add_argument('-b', '--batch_size', type=int, default=8, help='Batch size')
+    parser.add_argument('--memory_probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.memory_probe:
+        memory_probe(args.split)
+        sys.exit(0)
+
+    import torch
+    from agents.predict.inference import load_model
+    from benchmarks.claim_only import load_split
+    from benchmarks.padding_benchmark import percentile
+
+    texts, labels = load_split(args.split, args.limit)
+
+    fp32_model = load_model("none")
+    int8_model = load_model("int8")
+
+    # warm-up
+    evaluate(fp32_model, texts[:2], args.batch_size)
+    evaluate(int8_model, texts[:2], args.batch_size)
+
+    fp32_lat, fp32_probs = evaluate(fp32_model, texts, args.batch_size)
+    int8_lat, int8_probs = evaluate(int8_model, texts, args.batch_size)
+
+    fp32_probs = torch.cat(fp32_probs)
+    int8_probs = torch.cat(int8_probs)
+    fp32_preds = fp32_probs.argmax(dim=-1).tolist()
+    int8_preds = int8_probs.argmax(dim=-1).tolist()
+
+    fp32_acc = sum(p == y for p, y in zip(fp32_preds, labels)) / len(labels) * 100
+    int8_acc = sum(p == y for p, y in zip(int8_preds, labels)) / len(labels) * 100
+    agreement = sum(a == b for a, b in zip(fp32_preds, int8_preds)) / len(labels) * 100
+    max_prob_diff = (fp32_probs - int8_probs).abs().max().item()
+
+    fp32_rss = measure_rss("none", args.split)
+    int8_rss = measure_rss("int8", args.split)
+
+    print(dedent(f'''
+    ----------------------------------------------------------
+     INT8 Parity Report ({args.split}, {len(texts)} texts, batch {args.batch_size})
+    ----------------------------------------------------------
+     Metric                  | fp32         | int8
+    ----------------------------------------------------------
+     Accuracy                | {fp32_acc:>10.2f}% | {int8_acc:>10.2f}%
+     Mean ms/item            | {statistics.mean(fp32_lat):>11.2f} | {statistics.mean(int8_lat):>11.2f}
+     p95 ms/item             | {percentile(fp32_lat, 0.95):>11.2f} | {percentile(int8_lat, 0.95):>11.2f}
+     Weights (state_dict MB) | {state_dict_mb(fp32_model):>11.1f} | {state_dict_mb(int8_model):>11.1f}
+     Max RSS per worker (MB) | {fp32_rss:>11.1f} | {int8_rss:>11.1f}
+    ----------------------------------------------------------
+     Label agreement         | {agreement:.2f}%
+     Max |prob fp32 - int8|  | {max_prob_diff:.4f}
+     Throughput speedup      | {statistics.mean(fp32_lat) / statistics.mean(int8_lat):.2f}x
+    ----------------------------------------------------------
+    '''))
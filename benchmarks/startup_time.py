@@ -0,0 +1,80 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from textwrap import dedent
+
+# python -m benchmarks.startup_time --runs 5
+# ukur waktu import main.py (cold start sampai app bisa terima request)
+# dan waktu load model IndoBERT yang sekarang ditunda sampai warm-up / request pertama
+
+IMPORT_APP = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+LOAD_MODEL = (
+    "import time; import main; t = time.perf_counter(); "
+    "from agents.predict.predict import warmup; warmup(); print(time.perf_counter() - t)"
+)
+
+
+def timed(code, env):
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top):
+    # python -X importtime: "import time: self [us] | cumulative | imported package"
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].rstrip()))
+
+    # hanya package level atas supaya tidak double count
+    rows = [(cumulative, name) for cumulative, name in rows if not name.startswith("  ")]
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Startup Time Benchmark')
+    parser.add_argument('-r', '--runs', type=int, default=5, help='Number of cold starts')
+    parser.add_argument('-t', '--top', type=int, default=10, help='Number of slowest imports to show')
+    parser.add_argument('--skip_model', action='store_true', help='Do not measure model loading')
+    args = parser.parse_args()
+
+    # warm-up background dimatikan supaya yang terukur hanya import
+    env = dict(os.environ, WARMUP_ON_STARTUP="false")
+
+    import_times = [timed(IMPORT_APP, env) for _ in range(args.runs)]
+
+    print(dedent(f'''
+    -----------------------------------
+     Startup Time ({args.runs} runs)
+    -----------------------------------
+     import main (median) | {statistics.median(import_times):.2f} s
+     import main (max)    | {max(import_times):.2f} s'''))
+
+    if not args.skip_model:
+        load_times = [timed(LOAD_MODEL, env) for _ in range(args.runs)]
+        print(f"     model warm-up (med)  | {statistics.median(load_times):.2f} s")
+
+    print("    -----------------------------------")
+    print("     Slowest imports (cumulative)")
+    print("    -----------------------------------")
+    for cumulative, name in slowest_imports(env, args.top):
+        print(f"     {cumulative / 1e6:>6.2f} s | {name.strip()}")
+    print("    -----------------------------------")
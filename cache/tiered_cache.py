@@ -0,0 +1,164 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TieredCache:
+    """LRU di memori + (opsional) SQLite di disk supaya tetap ada setelah restart.
+
+    `namespace` menandai versi data (misal identitas model); entry dari namespace
+    lain dianggap tidak valid dan dibuang saat cache dibuka. `ttl` (detik) opsional,
+    None berarti entry tidak pernah kedaluwarsa. `compress=True` menyimpan value di
+    disk dalam bentuk zstd.
+
+    Eviksi disk dijalankan per `evict_every` write (jumlah entry bisa lewat sedikit dari
+    `max_disk_items` di antaranya). `accessed_at` untuk LRU disk diperbarui malas: hanya
+    kalau sudah lebih lama dari `touch_interval` detik, dan ditulis bersama write berikutnya.
+    """
+
+    def __init__(self, max_items=1024, disk_path=None, max_disk_items=100_000, namespace="", ttl=None, compress=False,
+                 evict_every=256, touch_interval=300):
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items
+        self.namespace = namespace
+        self.ttl = ttl
+        self.evict_every = max(1, evict_every)
+        self.touch_interval = touch_interval
+        self._writes = 0
+        self._touched = {}
+
+        self._compressor = None
+        self._decompressor = None
+        if compress:
+            import zstandard
+            self._compressor = zstandard.ZstdCompressor(level=3)
+            self._decompressor = zstandard.ZstdDecompressor()
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if disk_path:
+            os.makedirs(os.path.dirname(disk_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, namespace TEXT, value TEXT, accessed_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)")
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(cache)")]
+            if "expires_at" not in columns:
+                self._db.execute("ALTER TABLE cache ADD COLUMN expires_at REAL")
+            self._db.execute("DELETE FROM cache WHERE namespace != ?", (namespace,))
+            self._evict()
+            self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                raw, expires_at = self._memory[key]
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(raw)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at, accessed_at FROM cache "
+                    "WHERE key = ? AND namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, self.namespace, now)
+                ).fetchone()
+                if row:
+                    # read tidak menulis ke disk; accessed_at ikut commit write / eviksi berikutnya
+                    if row[2] is None or now - row[2] > self.touch_interval:
+                        self._touched[key] = now
+                        if len(self._touched) >= self.evict_every:
+                            self._flush_touched()
+                            self._db.commit()
+                    raw = self._decode(row[0])
+                    self._remember(key, raw, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return json.loads(raw)
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        raw = json.dumps(value, ensure_ascii=False)
+        ttl = ttl if ttl is not None else self.ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        with self._lock:
+            self._remember(key, raw, expires_at)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, namespace, value, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, self.namespace, self._encode(raw), now, expires_at)
+                )
+                self._touched.pop(key, None)
+                self._writes += 1
+                if self._writes >= self.evict_every:
+                    self._flush_touched()
+                    self._evict()
+                self._db.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        # entry kedaluwarsa + entry paling lama tidak diakses di atas max_disk_items; COUNT sekali per batch
+        self._writes = 0
+        self._db.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        count = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self.max_disk_items:
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_disk_items,)
+            )
+
+    def _encode(self, raw):
+        if self._compressor is None:
+            return raw
+        return self._compressor.compress(raw.encode("utf-8"))
+
+    def _decode(self, stored):
+        if isinstance(stored, bytes) and self._decompressor is not None:
+            return self._decompressor.decompress(stored).decode("utf-8")
+        return stored
+
+    def _remember(self, key, raw, expires_at=None):
+        self._memory[key] = (raw, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0,
+            "memory_items": len(self._memory),
+            "persistent": self._db is not None,
+            "namespace": self.namespace,
+        }
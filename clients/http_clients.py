@@ -0,0 +1,116 @@
+import os
+import queue
+import threading
+from dotenv import load_dotenv
+
+# client HTTP yang dipakai bersama satu proses: koneksi keep-alive (HTTP/2 kalau server
+# mendukung) dipakai ulang antar request & stage pipeline, bukan handshake TLS tiap panggilan
+load_dotenv()
+
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+CSE_HTTP_POOL_SIZE = int(os.getenv("CSE_HTTP_POOL_SIZE", "8"))
+CSE_TIMEOUT = float(os.getenv("CSE_TIMEOUT", "15"))
+
+_lock = threading.Lock()
+_http_client = None
+_pinned_http_client = None
+_cse_service = None
+_cse_http_pool = queue.LifoQueue(maxsize=CSE_HTTP_POOL_SIZE)
+
+
+def get_http_client():
+    # httpx.Client thread-safe, satu pool koneksi untuk semua host
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = _build_http_client()
+    return _http_client
+
+
+def _build_http_client():
+    import httpx
+
+    http2 = HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("⚠️ package h2 tidak ada → HTTP/1.1")
+            http2 = False
+
+    return httpx.Client(
+        http2=http2,
+        follow_redirects=True,
+        timeout=httpx.Timeout(HTTP_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_pinned_http_client():
+    # untuk URL dari pihak luar (lihat clients/url_guard): request dikirim ke IP yang sudah dicek,
+    # jadi koneksi tidak boleh dipakai ulang untuk host lain di IP yang sama (SNI/Host berbeda)
+    global _pinned_http_client
+    if _pinned_http_client is None:
+        with _lock:
+            if _pinned_http_client is None:
+                import httpx
+                _pinned_http_client = httpx.Client(
+                    follow_redirects=False,
+                    trust_env=False,
+                    timeout=httpx.Timeout(HTTP_TIMEOUT),
+                    limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=0),
+                )
+    return _pinned_http_client
+
+
+def get_cse_service():
+    # discovery document Custom Search cukup di-parse sekali per proses
+    global _cse_service
+    if _cse_service is None:
+        with _lock:
+            if _cse_service is None:
+                from googleapiclient.discovery import build
+                _cse_service = build(
+                    "customsearch", "v1",
+                    developerKey=os.getenv("GOOGLE_API_KEY"),
+                    cache_discovery=False
+                )
+    return _cse_service
+
+
+def execute_cse(request):
+    # httplib2.Http tidak thread-safe -> pinjam satu dari pool per eksekusi,
+    # koneksinya tetap keep-alive untuk peminjam berikutnya
+    import httplib2
+
+    try:
+        http = _cse_http_pool.get_nowait()
+    except queue.Empty:
+        http = httplib2.Http(timeout=CSE_TIMEOUT)
+
+    try:
+        return request.execute(http=http)
+    finally:
+        try:
+            _cse_http_pool.put_nowait(http)
+        except queue.Full:
+            http.close()
+
+
+def close_clients():
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
+    while not _cse_http_pool.empty():
+        _cse_http_pool.get_nowait().close()
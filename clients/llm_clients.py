@@ -0,0 +1,26 @@
+import threading
+
+# runtime LLM dibuat sekali per proses (bukan tiap explanation/claim_check/advance_classify)
+_lock = threading.Lock()
+_gpt_runtime = None
+_groq_runtime = None
+
+
+def get_gpt_runtime():
+    global _gpt_runtime
+    if _gpt_runtime is None:
+        with _lock:
+            if _gpt_runtime is None:
+                from llm.gpt_runtime import GPTRunTime
+                _gpt_runtime = GPTRunTime()
+    return _gpt_runtime
+
+
+def get_groq_runtime():
+    global _groq_runtime
+    if _groq_runtime is None:
+        with _lock:
+            if _groq_runtime is None:
+                from llm.groq_runtime import GroqRunTime
+                _groq_runtime = GroqRunTime()
+    return _groq_runtime
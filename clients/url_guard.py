@@ -0,0 +1,111 @@
+import ipaddress
+import socket
+import time
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlsplit
+from clients.http_clients import get_pinned_http_client
+
+# request ke URL dari user / pihak luar (direct fetch artikel, callback job) tidak boleh menjangkau
+# jaringan internal server: loopback, private, link-local (metadata cloud 169.254.169.254), dst.
+# host di-resolve dan dicek di SETIAP hop, lalu koneksi dibuka ke IP hasil cek itu juga
+# (bukan resolve ulang -> DNS rebinding tidak bisa menukar alamat di antaranya). redirect diikuti manual.
+MAX_REDIRECTS = 5
+
+
+class UnsafeURL(ValueError):
+    pass
+
+
+class ResponseTooLarge(ValueError):
+    pass
+
+
+def check_public_url(url):
+    # -> alamat IP publik host (string) yang boleh dihubungi
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeURL(f"URL tidak valid: {url}")
+
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+    except (socket.gaierror, UnicodeError) as e:
+        raise UnsafeURL(f"host tidak bisa di-resolve: {parts.hostname}") from e
+
+    addresses = []
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if getattr(address, "ipv4_mapped", None):
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise UnsafeURL(f"host {parts.hostname} mengarah ke alamat non-publik ({address})")
+        addresses.append(str(address))
+    if not addresses:
+        raise UnsafeURL(f"host tidak bisa di-resolve: {parts.hostname}")
+    return addresses[0]
+
+
+def _pinned_request(client, method, url, address, headers=None, **kwargs):
+    # URL ditulis ulang ke IP; Host header & SNI (verifikasi sertifikat) tetap memakai hostname asli
+    import httpx
+
+    original = httpx.URL(url)
+    headers = dict(headers or {})
+    headers["Host"] = original.netloc.decode("ascii")
+    extensions = {"sni_hostname": original.host} if original.scheme == "https" else None
+    return client.build_request(
+        method, original.copy_with(host=address), headers=headers, extensions=extensions, **kwargs
+    )
+
+
+def _remaining(until, url):
+    left = until - time.monotonic()
+    if left <= 0:
+        raise TimeoutError(f"batas waktu habis: {url}")
+    return left
+
+
+@contextmanager
+def safe_stream(method, url, timeout, max_redirects=MAX_REDIRECTS, **kwargs):
+    # seperti client.stream, tapi setiap hop (termasuk target redirect) harus alamat publik.
+    # timeout = batas total (semua hop + membaca body lewat read_limited), bukan per operasi.
+    # response redirect terakhir dikembalikan apa adanya kalau max_redirects habis
+    client = get_pinned_http_client()
+    until = time.monotonic() + timeout
+    response = None
+    try:
+        for hop in range(max_redirects + 1):
+            address = check_public_url(url)
+            request = _pinned_request(client, method, url, address, timeout=_remaining(until, url), **kwargs)
+            response = client.send(request, stream=True)
+            response.until = until
+
+            location = response.headers.get("Location")
+            if not response.is_redirect or not location or hop == max_redirects:
+                break
+            response.close()
+            url = urljoin(url, location)
+            # 303 (dan 301/302 untuk POST, mengikuti browser) -> GET tanpa body
+            if response.status_code == 303 or (response.status_code in (301, 302) and method == "POST"):
+                method = "GET"
+                for key in ("json", "data", "content"):
+                    kwargs.pop(key, None)
+        yield response
+    finally:
+        if response is not None:
+            response.close()
+
+
+def read_limited(response, max_bytes):
+    # baca body response safe_stream; berhenti (ResponseTooLarge) begitu melewati max_bytes,
+    # TimeoutError kalau batas total safe_stream habis di tengah jalan (server yang menetes pelan)
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise ResponseTooLarge(f"Content-Length {length} > {max_bytes} byte")
+
+    body = bytearray()
+    for chunk in response.iter_bytes():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise ResponseTooLarge(f"body > {max_bytes} byte")
+        _remaining(response.until, response.url)
+    return bytes(body)
@@ -1,7 +1,10 @@
 import os
-import requests
+import json
 import time
+import httpx
 from dotenv import load_dotenv
+from clients.http_clients import get_http_client
+from agents.pipeline.deadline import DeadlineExceeded, time_left
 
 import logging
 logger = logging.getLogger(__name__)
@@ -12,6 +15,10 @@ class GPTRunTime:
         self.api_key = os.getenv("OPENAI_API_KEY")
         self.url = "https://telkom-ai-dag.api.apilogy.id/dummy_api/0.0.0-llm-dummy/v1/llm/chat/completions"
         self.model = "llm_mini_max"
+        self.client = get_http_client()
+        self.timeout = float(os.getenv("GPT_TIMEOUT", "300"))
+        self.max_retries = int(os.getenv("GPT_MAX_RETRIES", "5"))
+        self.retry_delay = float(os.getenv("GPT_RETRY_DELAY", "5"))
 
     def generate_response(self, system_prompt: str, user_prompt: str):
         payload = {
@@ -30,12 +37,13 @@ class GPTRunTime:
             "x-api-key": self.api_key
         }
 
-        max_retries = 5
-        delay_seconds = 5
+        max_retries = self.max_retries
+        delay_seconds = self.retry_delay
 
         for attempt in range(1, max_retries + 1):
+            # timeout & jeda retry dipotong sisa deadline request; habis -> DeadlineExceeded
             try:
-                response = requests.post(self.url, headers=headers, json=payload, timeout=300)
+                response = self.client.post(self.url, headers=headers, json=payload, timeout=time_left(self.timeout))
 
                 if response.status_code == 200:
                     data = response.json()
@@ -50,13 +58,74 @@ class GPTRunTime:
                     logger.error(f"Request gagal (status {response.status_code}). Percobaan ke-{attempt}/{max_retries}.")
                     logger.error(response.text)
 
-            except requests.exceptions.RequestException as e:
+            except httpx.HTTPError as e:
                 logger.error(f"Error saat request (percobaan ke-{attempt}/{max_retries}): {e}")
 
             if attempt < max_retries:
+                remaining = time_left()
+                if remaining is not None and remaining <= delay_seconds:
+                    raise DeadlineExceeded("sisa waktu tidak cukup untuk retry GPT")
                 logger.info(f"⏳ Menunggu {delay_seconds} detik sebelum mencoba lagi...")
                 time.sleep(delay_seconds)
 
         logger.error("❌ Gagal mendapatkan respons setelah beberapa percobaan.")
         return ""
 
+    def stream_response(self, system_prompt: str, user_prompt: str):
+        # generator potongan teks (SSE OpenAI-compatible: "data: {...}" ... "data: [DONE]")
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_completion_tokens": 10000,
+            "stream": True
+        }
+
+        headers = {
+            "Accept": "text/event-stream",
+            "Content-Type": "application/json",
+            "x-api-key": self.api_key
+        }
+
+        received = False
+        try:
+            with self.client.stream("POST", self.url, headers=headers, json=payload, timeout=time_left(self.timeout)) as response:
+                if response.status_code != 200:
+                    response.read()
+                    logger.error(f"Stream gagal (status {response.status_code}): {response.text}")
+                else:
+                    for line in response.iter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+
+                        # baris rusak / bukan objek (keep-alive, pesan error proxy) dilewati
+                        try:
+                            chunk = json.loads(data)
+                        except ValueError:
+                            logger.warning(f"Chunk stream tidak valid dilewati: {data[:200]}")
+                            continue
+                        if not isinstance(chunk, dict):
+                            continue
+                        choices = chunk.get("choices") or [{}]
+                        delta = (choices[0].get("delta") or {}).get("content") if isinstance(choices[0], dict) else None
+                        if delta:
+                            received = True
+                            yield delta
+                        # cek deadline tiap chunk, timeout httpx hanya per read
+                        time_left()
+                    if received:
+                        return
+        except httpx.HTTPError as e:
+            if received:
+                raise
+            logger.error(f"Error saat stream: {e}")
+
+        # belum ada token sama sekali -> jalur biasa (dengan retry), dikirim sekaligus
+        content = self.generate_response(system_prompt, user_prompt)
+        if content:
+            yield content
@@ -1,14 +1,17 @@
 import os
-from groq import Groq
 from dotenv import load_dotenv
+from clients.http_clients import get_http_client
 
 class GroqRunTime():
     def __init__(self):
         load_dotenv()
         self.api_key = os.getenv("GROQ_KEY")
 
+        from groq import Groq
+
         self.client = Groq(
             api_key=self.api_key,
+            http_client=get_http_client(),
         )
 
     def generate_response(self, system_prompt, user_prompt):
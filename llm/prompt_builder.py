@@ -0,0 +1,192 @@
+import os
+import json
+import threading
+
+# susun user prompt LLM dalam budget token per stage: field evidence yang tidak dipakai model
+# dibuang, JSON dikirim ringkas, dan bagian panjang (konten berita, evidence, daftar link)
+# dipotong sesuai bobot/prioritas sampai muat. token dihitung pakai tiktoken kalau terpasang,
+# kalau tidak pakai perkiraan karakter per token.
+PROMPT_BUDGETS = {
+    "advance_classification": int(os.getenv("PROMPT_BUDGET_ADVANCE", "2500")),
+    "explanation": int(os.getenv("PROMPT_BUDGET_EXPLANATION", "2500")),
+    "claim_check": int(os.getenv("PROMPT_BUDGET_CLAIM_CHECK", "1500")),
+}
+PROMPT_TOKENIZER = os.getenv("PROMPT_TOKENIZER", "o200k_base")
+CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", "3.5"))
+# judul berita masuk budget sebagai section sendiri, dipotong paling panjang segini
+PROMPT_TITLE_MAX_TOKENS = int(os.getenv("PROMPT_TITLE_MAX_TOKENS", "128"))
+
+# field hasil scrape yang relevan untuk LLM (featured_image, tanggal tidak dipakai)
+EVIDENCE_FIELDS = ("judul", "sumber", "link", "content")
+ELLIPSIS = " …"
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(PROMPT_TOKENIZER)
+                except Exception:
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def truncate_tokens(text, max_tokens):
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        cut = encoding.decode(tokens[:max(0, max_tokens - 1)])
+    else:
+        cut = text[:max(0, int((max_tokens - 1) * CHARS_PER_TOKEN))]
+        # jangan potong di tengah kata
+        if " " in cut:
+            cut = cut[:cut.rfind(" ")]
+    return cut.rstrip() + ELLIPSIS
+
+
+def compact_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class Text:
+    # teks bebas (misal isi berita input / judul), dipotong di akhir; max_tokens = batas atas
+    def __init__(self, text, weight=1.0, max_tokens=None):
+        self.text = text or ""
+        if max_tokens is not None:
+            self.text = truncate_tokens(self.text, max_tokens)
+        self.weight = weight
+
+    def pieces(self):
+        return [(self.text, self.weight, False)]
+
+    def render(self, fitted):
+        return fitted[0]
+
+
+class Items:
+    # daftar pendek (misal link evidence) dalam urutan prioritas; item paling belakang dibuang duluan
+    def __init__(self, items, weight=1.0):
+        self.items = [str(item) for item in (items or [])]
+        self.weight = weight
+
+    def pieces(self):
+        return [("\n".join(self.items), self.weight, True)]
+
+    def render(self, fitted):
+        return compact_json([line for line in fitted[0].split("\n") if line])
+
+
+class Evidence:
+    # hasil scrape (urutan = prioritas); metadata selalu masuk, content dibagi dengan bobot menurun
+    def __init__(self, items, weight=1.0):
+        self.items = [
+            {field: item.get(field) for field in EVIDENCE_FIELDS if item.get(field)}
+            for item in (items or []) if item
+        ]
+        self.weight = weight
+
+    def pieces(self):
+        return [
+            (item.get("content", ""), self.weight / (rank + 1), False)
+            for rank, item in enumerate(self.items)
+        ]
+
+    def render(self, fitted):
+        return compact_json([
+            {**item, "content": content} if content else {k: v for k, v in item.items() if k != "content"}
+            for item, content in zip(self.items, fitted)
+        ])
+
+
+def _allocate(needs, weights, available):
+    # water-filling: bagi token sesuai bobot, jatah yang tidak terpakai diberikan ke bagian lain
+    allocation = [0] * len(needs)
+    active = [i for i, need in enumerate(needs) if need > 0]
+    remaining = max(0, available)
+
+    while active and remaining > 0:
+        total_weight = sum(weights[i] for i in active) or 1.0
+        satisfied = [i for i in active if needs[i] <= remaining * weights[i] / total_weight]
+        if not satisfied:
+            for i in active:
+                allocation[i] = int(remaining * weights[i] / total_weight)
+            break
+        for i in satisfied:
+            allocation[i] = needs[i]
+            remaining -= needs[i]
+            active.remove(i)
+
+    return allocation
+
+
+def _fit_piece(text, tokens, whole_lines):
+    if not whole_lines:
+        return truncate_tokens(text, tokens)
+
+    kept = []
+    used = 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + 1
+        if used + cost > tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def build_prompt(stage, template, system_prompt="", **sections):
+    # template(**bagian_yang_sudah_dipotong) -> user prompt; sections: Text / Items / Evidence
+    budget = PROMPT_BUDGETS[stage]
+
+    names = list(sections)
+    pieces = {name: sections[name].pieces() for name in names}
+
+    empty = {name: sections[name].render(["" for _ in pieces[name]]) for name in names}
+    overhead = count_tokens(system_prompt) + count_tokens(template(**empty))
+
+    flat = [(name, text, weight, whole_lines) for name in names for text, weight, whole_lines in pieces[name]]
+    needs = [count_tokens(text) for _, text, _, _ in flat]
+    weights = [weight for _, _, weight, _ in flat]
+
+    available = budget - overhead
+    if available <= 0:
+        print(f"⚠️ prompt {stage}: bagian tetap template sudah ±{overhead} token (budget {budget})")
+    for _ in range(3):
+        allocation = _allocate(needs, weights, available)
+        fitted = {name: [] for name in names}
+        for (name, text, _, whole_lines), need, tokens in zip(flat, needs, allocation):
+            fitted[name].append(text if tokens >= need else _fit_piece(text, tokens, whole_lines))
+
+        prompt = template(**{name: sections[name].render(fitted[name]) for name in names})
+        total = count_tokens(system_prompt) + count_tokens(prompt)
+        # escape JSON (\n, kutip) bisa sedikit menambah token -> kurangi jatah lalu ulangi
+        if total <= budget:
+            break
+        available -= total - budget
+
+    full = overhead + sum(needs)
+    if full > budget:
+        print(f"✂️ prompt {stage}: ±{full} → ±{total} token (budget {budget})")
+    return prompt
@@ -1,26 +1,34 @@
-import json
-from typing import Union
-from fastapi import FastAPI
-from pydantic import BaseModel
-from agents.predict.predict import classify_berita
-from agents.predict.predict import advance_classify_berita
-from agents.get_evidence.google_search import google_search
-from agents.get_evidence.scrape_html import scrape_html
-from agents.explanation.explanation import explanation
-from agents.claim_check.claim_check import claim_check
-from agents.chat.chat import agent
-from auth.supabase_client import supabase
-from typing import List, Any, Optional
-import asyncio
-from routers import predict, chat, news, auth, profile
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from routers import predict, chat, news, auth, profile, health, jobs
+from clients.http_clients import close_clients
+from agents.pipeline.deadline import DeadlineExceeded
+from agents.jobs.job_queue import job_queue
 
 
 #uvicorn main:app --reload
 #uvicorn main:app --host 0.0.0.0 --port 8000
+#SHARED_WEIGHTS=mmap WEB_CONCURRENCY=4 uvicorn main:app --host 0.0.0.0 --port 8000
 #hcsp_1_5g
 #http://192.168.50.110:8000/docs
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # model & chat agent di-load di background, API sudah bisa terima request
+    health.start_warmup()
+    # worker job asinkron; job yang belum selesai sebelum restart dilanjutkan
+    job_queue.start()
+    yield
+    job_queue.stop()
+    close_clients()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    # stage wajib (scrape artikel utama / IndoBERT) tidak selesai dalam batas waktu request
+    return JSONResponse(status_code=504, content={"detail": f"Batas waktu request habis: {exc}"})
 
 @app.get("/")
 def read_root():
@@ -31,6 +39,8 @@ app.include_router(chat.router)
 app.include_router(news.router)
 app.include_router(auth.router)
 app.include_router(profile.router)
+app.include_router(health.router)
+app.include_router(jobs.router)
 
 
 
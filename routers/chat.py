@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from agents.chat.chat import agent
+from agents.chat.chat import get_agent
 
 router = APIRouter(tags=["Chat Agent"])
 
@@ -13,7 +13,7 @@ def chat_endpoint(data: ChatRequest):
     user_message = data.message
 
     try:
-        response = agent.run(user_message)
+        response = get_agent().run(user_message)
         return {
             "response": response
         }
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+from fastapi import APIRouter, Response
+from agents.predict.predict import is_model_loaded, warmup as warmup_indobert
+from agents.chat.chat import is_agent_loaded, get_agent
+from agents.get_evidence import passage_ranker
+
+router = APIRouter(tags=["Health"])
+
+# true: subsystem berat di-load di background saat startup; false: murni lazy (load saat request pertama)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+
+# nama -> (fungsi load, cek sudah loaded)
+SUBSYSTEMS = {
+    "indobert": (warmup_indobert, is_model_loaded),
+    "chat_agent": (get_agent, is_agent_loaded),
+    "passage_ranker": (passage_ranker.warmup, passage_ranker.is_loaded),
+}
+
+_status = {name: {"state": "not_loaded"} for name in SUBSYSTEMS}
+
+
+def _load(name):
+    load, _ = SUBSYSTEMS[name]
+    _status[name] = {"state": "loading"}
+    start = time.perf_counter()
+    try:
+        load()
+        _status[name] = {"state": "loaded", "seconds": round(time.perf_counter() - start, 2)}
+        print(f"✅ {name} siap ({_status[name]['seconds']} s)")
+    except Exception as e:
+        _status[name] = {"state": "error", "error": str(e)}
+        print(f"❌ Gagal load {name}: {e}")
+
+
+def start_warmup():
+    if not WARMUP_ON_STARTUP:
+        return
+
+    def run():
+        for name in SUBSYSTEMS:
+            _load(name)
+
+    threading.Thread(target=run, name="warmup", daemon=True).start()
+
+
+@router.get("/ready")
+def ready(response: Response):
+    subsystems = {}
+    for name, (_, is_loaded) in SUBSYSTEMS.items():
+        status = dict(_status[name])
+        # bisa juga sudah ke-load lazy oleh request sebelum warm-up sampai ke sini
+        if is_loaded() and status["state"] != "loaded":
+            status = {"state": "loaded"}
+        subsystems[name] = status
+
+    is_ready = not WARMUP_ON_STARTUP or all(s["state"] == "loaded" for s in subsystems.values())
+    if not is_ready:
+        response.status_code = 503
+
+    return {"ready": is_ready, "warmup_on_startup": WARMUP_ON_STARTUP, "subsystems": subsystems}
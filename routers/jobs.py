@@ -0,0 +1,68 @@
+import math
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+from agents.jobs.job_queue import job_queue
+from clients.url_guard import check_public_url, UnsafeURL
+
+router = APIRouter(tags=["Jobs"])
+
+# versi asinkron /predict_with_evidence/, /predict_from_url/, /predict_from_claim/:
+# response 202 berisi job id, hasil diambil lewat GET /jobs/{id} atau dikirim ke callback_url
+
+class JobOptions(BaseModel):
+    callback_url: Optional[str] = None
+    budget: Optional[float] = None
+
+class EvidenceJobRequest(JobOptions):
+    title: str
+    content: str
+
+class UrlJobRequest(JobOptions):
+    url: str
+
+class ClaimJobRequest(JobOptions):
+    claim: str
+
+def _submit(request: Request, kind, data: JobOptions, payload):
+    if data.callback_url:
+        # callback dikirim dari server: tidak boleh mengarah ke jaringan internal
+        try:
+            check_public_url(data.callback_url)
+        except UnsafeURL as e:
+            raise HTTPException(status_code=422, detail=f"callback_url ditolak: {e}")
+    if data.budget is not None:
+        # JSON pydantic menerima NaN / Infinity
+        if not math.isfinite(data.budget):
+            raise HTTPException(status_code=422, detail="budget harus angka berhingga")
+        payload["budget"] = data.budget
+
+    job = job_queue.submit(kind, payload, callback_url=data.callback_url)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": str(request.url_for("get_job", job_id=job["id"])),
+    }
+
+@router.post("/jobs/predict_with_evidence", status_code=202)
+def submit_predict_with_evidence(data: EvidenceJobRequest, request: Request):
+    return _submit(request, "predict_with_evidence", data, {"title": data.title, "content": data.content})
+
+@router.post("/jobs/predict_from_url", status_code=202)
+def submit_predict_from_url(data: UrlJobRequest, request: Request):
+    return _submit(request, "predict_from_url", data, {"url": data.url})
+
+@router.post("/jobs/predict_from_claim", status_code=202)
+def submit_predict_from_claim(data: ClaimJobRequest, request: Request):
+    return _submit(request, "predict_from_claim", data, {"claim": data.claim})
+
+@router.get("/jobs/stats")
+def job_stats():
+    return job_queue.stats()
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return job
@@ -1,11 +1,24 @@
 import asyncio
-from fastapi import APIRouter
+import json
+import os
+from typing import List, Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 # from schemas.predict import PredictRequest, ClaimRequest, UrlRequest
-from agents.predict.predict import classify_berita, advance_classify_berita
+from agents.predict.predict import classify_berita, classify_many, result_cache
 from agents.get_evidence.google_search import google_search
-from agents.get_evidence.scrape_html import scrape_html
-from agents.explanation.explanation import explanation
-from agents.claim_check.claim_check import claim_check
+from agents.get_evidence.evidence_fetcher import fetch_evidence
+from agents.pipeline.verification import (
+    predict_with_evidence_pipeline,
+    predict_from_url_pipeline,
+    predict_from_claim_pipeline,
+    stream_predict_with_evidence,
+    stream_predict_from_url,
+    coalescing_stats,
+)
+from agents.pipeline.deadline import Deadline, STAGE_BUDGETS, parse_budget
+from agents.pipeline.pipeline import Stage, run_stages
+from agents.similar import similar_news
 from pydantic import BaseModel
 
 router = APIRouter(tags=["Prediction"])
@@ -19,34 +32,72 @@ def predict_fake_news(data: PredictRequest):
     result = classify_berita(data.title, data.content)
     return result
 
+@router.get("/predict/cache")
+def predict_cache_stats():
+    if result_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **result_cache.stats()}
+
+@router.get("/predict/coalescing")
+def predict_coalescing_stats():
+    # berapa request identik yang ikut menunggu eksekusi pipeline yang sedang jalan
+    return coalescing_stats()
+
+@router.get("/predict/similar")
+def predict_similar_stats():
+    # index embedding berita terverifikasi: evidence (dan verdict, kalau lolos cek ketat) berita yang hampir sama dipakai ulang
+    return similar_news.stats()
+
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "16"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+
+class BatchPredictRequest(BaseModel):
+    items: List[PredictRequest]
+
+@router.post("/predict/batch")
+def predict_batch(data: BatchPredictRequest):
+    if len(data.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Maksimal {BATCH_MAX_ITEMS} item per batch")
+
+    # satu baris JSON per item, dikirim setiap chunk selesai
+    def generate():
+        for start in range(0, len(data.items), BATCH_CHUNK_SIZE):
+            chunk = data.items[start:start + BATCH_CHUNK_SIZE]
+
+            try:
+                results = classify_many([(item.title, item.content) for item in chunk])
+            except Exception as e:
+                print(f"❌ Gagal klasifikasi batch {start}-{start + len(chunk) - 1}: {e}")
+                results = [{"error": str(e)}] * len(chunk)
+
+            for offset, result in enumerate(results):
+                yield json.dumps({"index": start + offset, **result}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 class ClaimRequest(BaseModel):
     claim: str
 
 @router.post("/get_evidence/")
 def get_evidence(
     data: ClaimRequest,
+    x_request_timeout: Optional[str] = Header(None),
 ):
     total_results: int = 10
     scrape_limit: int = 1  # cuma mau 1 evidence
     query = data.claim
-    # 1. Google Search
-    links = google_search(query, total_results=total_results)
-
-    # 2. Scraping dengan fallback ke link berikutnya
-    scraped = []
-
-    for url in links:  # cek semua link
-        if len(scraped) >= scrape_limit:
-            break  # sudah cukup evidence
-
-        content = scrape_html(url)
 
-        if content is None:
-            print(f"❌ Gagal scrape → {url}")
-            continue  # coba link berikutnya
-
-        print(f"✅ Berhasil scrape → {url}")
-        scraped.append(content)
+    # X-Request-Timeout sama seperti endpoint lain; search & scrape dipotong sisa waktu request
+    with Deadline(parse_budget(x_request_timeout)).activate():
+        results = run_stages([
+            # 1. Google Search
+            Stage("links", lambda: google_search(query, total_results=total_results),
+                  timeout=STAGE_BUDGETS["search"], fallback=lambda: []),
+            # 2. Scraping paralel, selesai begitu dapat scrape_limit evidence
+            Stage("scraped", lambda links: fetch_evidence(links, scrape_limit=scrape_limit),
+                  deps=["links"], timeout=STAGE_BUDGETS["scrape"], fallback=lambda links: []),
+        ])
+    links, scraped = results["links"], results["scraped"]
 
     return {
         "query": query,
@@ -58,184 +109,44 @@ def get_evidence(
 
 
 @router.post("/predict_with_evidence/")
-def predict_with_evidence(data: PredictRequest):
-    total_results = 10
-    scrape_limit = 1
-    links = google_search(data.title, total_results=total_results)
-
-    scraped = []
-    for url in links:
-        if len(scraped) >= scrape_limit:
-            break
-        content = scrape_html(url)
-        if content is None:
-            print(f"❌ Gagal scrape → {url}")
-            continue
-        print(f"✅ Berhasil scrape → {url}")
-        scraped.append(content)
-
-    classification = classify_berita(data.title, data.content)
-
-    advance_classification = advance_classify_berita(
-        classification=classification,
-        news_scrape=scraped,
-        title=data.title,
-        evidence_link=links,
-        content=content
-    )
-
-    llm_output = explanation(
-        classification=classification,
-        news_scrape=scraped,
-        evidence_link=links,
-        title=data.title,
-        content=data.content
+def predict_with_evidence(data: PredictRequest, x_request_timeout: Optional[str] = Header(None)):
+    # X-Request-Timeout: batas waktu request (detik), default REQUEST_BUDGET
+    return predict_with_evidence_pipeline(data.title, data.content, budget=parse_budget(x_request_timeout))
+
+def _sse(events):
+    # text/event-stream: "event: <stage>\ndata: <json>\n\n"
+    for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _sse_response(events):
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-    return {
-        "url": scraped[0].get("link", "") if scraped else "",
-        "title": data.title,
-        "content": data.content,
-        "classification": advance_classification,
-        "evidence_links": links,
-        "evidence_scraped": scraped,
-        "explanation": llm_output 
-    }
+@router.post("/predict_with_evidence/stream")
+def predict_with_evidence_stream(data: PredictRequest, x_request_timeout: Optional[str] = Header(None)):
+    # event: classification, links, scraped, advance_classification,
+    # explanation_delta (berulang), explanation, lalu result / error
+    return _sse_response(stream_predict_with_evidence(data.title, data.content, budget=parse_budget(x_request_timeout)))
 
 class UrlRequest(BaseModel):
     url: str
     
 @router.post("/predict_from_url/")
-def predict_from_url(data: UrlRequest):
-
-    # 1. Scrape artikel dari URL input
-    scraped_main = scrape_html(data.url)
-    if not scraped_main or scraped_main.get("content") == "Tidak berhasil ekstrak isi artikel":
-        return {
-            "error": "Gagal mengambil artikel dari URL",
-            "url": data.url
-        }
-
-    title = scraped_main.get("judul", "")
-    content = scraped_main.get("content", "")
-
-    # 2. Klasifikasi IndoBERT
-    classification = classify_berita(title, content)
-
-    # 3. Google Search
-    total_results = 10
-    scrape_limit = 1
-    links = google_search(title, total_results=total_results)
+def predict_from_url(data: UrlRequest, x_request_timeout: Optional[str] = Header(None)):
+    return predict_from_url_pipeline(data.url, budget=parse_budget(x_request_timeout))
 
-    # 4. Scrape evidence
-    scraped_evidence = []
-    for url in links:  # cek semua link
-        if len(scraped_evidence) >= scrape_limit:
-            break  # sudah cukup evidence
-
-        content = scrape_html(url)
-
-        if content is None:
-            print(f"❌ Gagal scrape → {url}")
-            continue  # coba link berikutnya
-
-        print(f"✅ Berhasil scrape → {url}")
-        scraped_evidence.append(content)
-
-    # 5. Advance Classification
-    advance_classification = advance_classify_berita(
-        classification=classification,
-        news_scrape=scraped_evidence,
-        title=title,
-        evidence_link=links,
-        content=content
-    )
-
-    # 6. LLM judgement
-    llm_output = explanation(
-        classification=advance_classification,
-        news_scrape=scraped_evidence,
-        title=title,
-        evidence_link=links,
-        content=content
-    )
-
-    # 7. Output final
-    return {
-        "url": data.url,
-        "title": title,
-        "content": content,
-        "classification": advance_classification,
-        "evidence_links": links,
-        "evidence_scraped": scraped_evidence,
-        "explanation": llm_output
-    }
+@router.post("/predict_from_url/stream")
+def predict_from_url_stream(data: UrlRequest, x_request_timeout: Optional[str] = Header(None)):
+    # sama seperti /predict_with_evidence/stream, diawali event "article" (hasil scrape URL input)
+    return _sse_response(stream_predict_from_url(data.url, budget=parse_budget(x_request_timeout)))
 
     
 @router.post("/predict_from_claim/")
-def predict_from_claim(data: ClaimRequest):
-
-    total_results: int = 10
-    scrape_limit: int = 1
-    query = data.claim
-
-    links = google_search(query, total_results=total_results)
-
-    claim_checked = claim_check(data.claim, links)
-
-    if "sesuai" not in claim_checked.lower():
-        return {
-            "url": "",
-            "title": "",
-            "content": "",
-            "classification": {
-                "final_label": "unknown",
-                "final_confidence": 0,
-                "error": "Claim tidak dapat diverifikasi dengan sumber yang ada: " + claim_checked
-            },
-            "evidence_links": links,
-            "evidence_scraped": [],
-            "explanation": "Claim tidak dapat diverifikasi dengan sumber yang ada: " + claim_checked
-        }
-
-    scraped = []
-    for url in links:
-        if len(scraped) >= scrape_limit:
-            break
-        content = scrape_html(url)
-        if content is None:
-            print(f"❌ Gagal scrape → {url}")
-            continue
-        print(f"✅ Berhasil scrape → {url}")
-        scraped.append(content)
-
-    classification = classify_berita(scraped[0].get("judul", ""), scraped[0].get("content", ""))
-
-    advance_classification = advance_classify_berita(
-        classification=classification,
-        news_scrape=scraped,
-        title=scraped[0].get("judul", ""),
-        evidence_link=links,
-        content=scraped[0].get("content", "")
-    )
-
-    llm_output = explanation(
-        classification=advance_classification,
-        news_scrape=scraped,
-        title=scraped[0].get("judul", ""),
-        evidence_link=links,
-        content=scraped[0].get("content", "")
-    )
-
-    return {
-        "url": links[0] if links else "",
-        "title": scraped[0].get("judul", "") if scraped else "",
-        "content": scraped[0].get("content", "") if scraped else "",
-        "classification": advance_classification,
-        "evidence_links": links,
-        "evidence_scraped": scraped,
-        "explanation": llm_output
-    }
+def predict_from_claim(data: ClaimRequest, x_request_timeout: Optional[str] = Header(None)):
+    return predict_from_claim_pipeline(data.claim, budget=parse_budget(x_request_timeout))
 
 @router.post("/predict_test/")
 async def predict_test(data: UrlRequest):
@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+from textwrap import dedent
+
+# python -m scripts.export_model --format onnx
+# python -m scripts.export_model --format torchscript --atol 1e-4
+# python -m scripts.export_model --format mmap   (bobot untuk SHARED_WEIGHTS=mmap)
+# convert checkpoint MODEL_DIR ke runtime lain lalu cek output-nya sama dengan model eager
+
+import torch
+from dotenv import load_dotenv
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from agents.predict.backends import INPUT_NAMES, OnnxBackend, TorchScriptBackend, example_inputs, trace_model
+from benchmarks.claim_only import load_split
+
+load_dotenv()
+
+
+def export_onnx(model, inputs, output):
+    args = tuple(inputs[name] for name in INPUT_NAMES)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    torch.onnx.export(
+        model,
+        args,
+        output,
+        input_names=INPUT_NAMES,
+        output_names=["logits"],
+        dynamic_axes=dynamic_axes,
+        opset_version=17,
+        do_constant_folding=True
+    )
+    return OnnxBackend(output)
+
+
+def export_torchscript(model, inputs, output):
+    traced = trace_model(model, inputs)
+    torch.jit.save(traced, output)
+    return TorchScriptBackend(output)
+
+
+def export_mmap(model, output):
+    state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    torch.save(state_dict, output)
+
+    # load ulang persis seperti SHARED_WEIGHTS=mmap di agents/predict/inference.py
+    reloaded = AutoModelForSequenceClassification.from_config(model.config).eval()
+    reloaded.load_state_dict(torch.load(output, mmap=True, weights_only=True, map_location="cpu"), assign=True)
+
+    def run(inputs):
+        with torch.inference_mode():
+            return reloaded(**inputs)[0]
+    return run
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export IndoBERT classifier')
+    parser.add_argument('-f', '--format', choices=['onnx', 'torchscript', 'mmap'], required=True, help='Target runtime')
+    parser.add_argument('-m', '--model_dir', default=os.getenv("MODEL_DIR"), help='HuggingFace checkpoint directory')
+    parser.add_argument('-o', '--output', default=None, help='Output file (default: inside model_dir)')
+    parser.add_argument('--atol', type=float, default=1e-4, help='Maximum absolute logit difference')
+    parser.add_argument('-n', '--samples', type=int, default=16, help='Number of claim_only texts used for the parity check')
+    args = parser.parse_args()
+
+    if not args.model_dir:
+        raise ValueError("❌ MODEL_DIR tidak ditemukan di file .env")
+
+    default_name = {"onnx": "model.onnx", "torchscript": "model.torchscript.pt", "mmap": "model.mmap.pt"}[args.format]
+    output = args.output or os.path.join(args.model_dir, default_name)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model_dir, torchscript=True).eval()
+
+    trace_inputs = example_inputs(tokenizer)
+    trace_inputs.setdefault("token_type_ids", torch.zeros_like(trace_inputs["input_ids"]))
+
+    if args.format == "onnx":
+        exported = export_onnx(model, trace_inputs, output)
+    elif args.format == "torchscript":
+        exported = export_torchscript(model, trace_inputs, output)
+    else:
+        exported = export_mmap(model, output)
+
+    # parity check: batch dengan panjang berbeda dari input tracing
+    texts, _ = load_split("test", limit=args.samples)
+    inputs = tokenizer(texts, return_tensors="pt", truncation=True, padding="longest", max_length=512)
+
+    with torch.inference_mode():
+        expected = model(**inputs)[0]
+    actual = exported(inputs)
+
+    max_diff = (expected - actual).abs().max().item()
+    label_match = (expected.argmax(dim=-1) == actual.argmax(dim=-1)).float().mean().item() * 100
+
+    print(dedent(f'''
+    -----------------------------------
+     Export Information
+    -----------------------------------
+     Format              | {args.format}
+     Output              | {output}
+     Max |logit diff|    | {max_diff:.2e}
+     Tolerance           | {args.atol:.0e}
+     Label agreement     | {label_match:.1f}%
+    -----------------------------------
+    '''))
+
+    if max_diff > args.atol:
+        print(f"❌ Output {args.format} berbeda dari model eager (>{args.atol})")
+        sys.exit(1)
+
+    print(f"✅ Export {args.format} valid")